@@ -0,0 +1,145 @@
+/**
+ * Idempotent replay tests.
+ *
+ * A retried paid request must get the original result back instead of
+ * playing (and paying out) a second game:
+ *   1. Same Idempotency-Key → stored response replayed
+ *   2. Same payment proof under a different key → rejected
+ *   3. Failed attempts are not stored, so they can be retried
+ */
+import { describe, it, expect } from "vitest";
+import express from "express";
+import request from "supertest";
+import { paymentMiddleware, type PaymentConfig } from "../middleware/payment.js";
+import { idempotencyMiddleware } from "../middleware/idempotency.js";
+import gameRoutes from "../routes/games.js";
+
+function createTestApp() {
+  const app = express();
+  app.use(express.json());
+
+  const paymentConfig: PaymentConfig = {
+    payTo: "0x1234567890abcdef1234567890abcdef12345678",
+    network: "eip155:8453",
+    asset: "USDC",
+    facilitatorUrl: "https://x402.org/facilitator",
+    description: "Clawsino Test",
+    devMode: false,
+    demoMode: true,
+    onchainMode: false,
+  };
+
+  const idempotency = idempotencyMiddleware();
+  for (const game of ["coinflip", "dice", "blackjack"]) {
+    app.use(`/api/${game}`, idempotency);
+    app.use(`/api/${game}`, paymentMiddleware(paymentConfig));
+  }
+  app.use("/api", gameRoutes);
+  return app;
+}
+
+describe("idempotent replay", () => {
+  const app = createTestApp();
+
+  it("echoes the Idempotency-Key, even on the 402", async () => {
+    const res = await request(app)
+      .post("/api/coinflip")
+      .set("Idempotency-Key", "probe-1")
+      .send({ choice: "heads", bet: 0.10 });
+
+    expect(res.status).toBe(402);
+    expect(res.headers["idempotency-key"]).toBe("probe-1");
+  });
+
+  it("replays the stored result for a repeated key", async () => {
+    const send = () => request(app)
+      .post("/api/dice")
+      .set("Idempotency-Key", "retry-1")
+      .set("X-PAYMENT", "x402:dev:retry-tx-1")
+      .send({ prediction: "over", target: 7, bet: 0.25 });
+
+    const first = await send();
+    const second = await send();
+
+    expect(first.status).toBe(200);
+    expect(second.status).toBe(200);
+    expect(second.body).toEqual(first.body);
+    expect(second.headers["idempotent-replayed"]).toBe("true");
+  });
+
+  it("concurrent retries share one game", async () => {
+    const send = () => request(app)
+      .post("/api/blackjack")
+      .set("Idempotency-Key", "retry-2")
+      .set("X-PAYMENT", "x402:dev:retry-tx-2")
+      .send({ bet: 1.00 });
+
+    const [a, b] = await Promise.all([send(), send()]);
+    expect(a.status).toBe(200);
+    expect(b.status).toBe(200);
+    expect(a.body.game_id).toBe(b.body.game_id);
+  });
+
+  it("rejects a key reused with a different body", async () => {
+    await request(app)
+      .post("/api/coinflip")
+      .set("Idempotency-Key", "retry-3")
+      .set("X-PAYMENT", "x402:dev:retry-tx-3")
+      .send({ choice: "heads", bet: 0.10 });
+
+    const res = await request(app)
+      .post("/api/coinflip")
+      .set("Idempotency-Key", "retry-3")
+      .set("X-PAYMENT", "x402:dev:retry-tx-3")
+      .send({ choice: "tails", bet: 0.10 });
+
+    expect(res.status).toBe(422);
+  });
+
+  it("refuses the same payment under a different key", async () => {
+    const first = await request(app)
+      .post("/api/coinflip")
+      .set("Idempotency-Key", "pay-1")
+      .set("X-PAYMENT", "x402:dev:reused-tx")
+      .send({ choice: "heads", bet: 0.10 });
+    expect(first.status).toBe(200);
+
+    const res = await request(app)
+      .post("/api/coinflip")
+      .set("Idempotency-Key", "pay-2")
+      .set("X-PAYMENT", "x402:dev:reused-tx")
+      .send({ choice: "heads", bet: 0.10 });
+    expect(res.status).toBe(409);
+    expect(res.body.error).toBe("Payment already used");
+  });
+
+  it("refuses a replayed payment without any key", async () => {
+    const first = await request(app)
+      .post("/api/coinflip")
+      .set("X-PAYMENT", "x402:dev:keyless-tx")
+      .send({ choice: "tails", bet: 0.10 });
+    expect(first.status).toBe(200);
+
+    const res = await request(app)
+      .post("/api/coinflip")
+      .set("X-PAYMENT", "x402:dev:keyless-tx")
+      .send({ choice: "tails", bet: 0.10 });
+    expect(res.status).toBe(409);
+  });
+
+  it("does not store failed attempts, so the payment can be retried", async () => {
+    const bad = await request(app)
+      .post("/api/coinflip")
+      .set("Idempotency-Key", "fix-1")
+      .set("X-PAYMENT", "x402:dev:fix-tx")
+      .send({ choice: "edge", bet: 0.10 });
+    expect(bad.status).toBe(400);
+
+    const good = await request(app)
+      .post("/api/coinflip")
+      .set("Idempotency-Key", "fix-2")
+      .set("X-PAYMENT", "x402:dev:fix-tx")
+      .send({ choice: "heads", bet: 0.10 });
+    expect(good.status).toBe(200);
+  });
+});
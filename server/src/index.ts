@@ -8,6 +8,7 @@ import { fileURLToPath } from "url";
 import gameRoutes from "./routes/games.js";
 import { paymentMiddleware } from "./middleware/payment.js";
 import { rateLimitMiddleware } from "./middleware/rateLimit.js";
+import { idempotencyMiddleware } from "./middleware/idempotency.js";
 import { requestLoggingMiddleware } from "./middleware/logging.js";
 
 const __filename = fileURLToPath(import.meta.url);
@@ -127,6 +128,13 @@ const paymentConfig = {
   gameServerPrivateKey: process.env.GAME_SERVER_PRIVATE_KEY || "",
 };
 
+// Idempotent replay — a retried paid request gets the stored result instead of a second game.
+// Runs before payment so replays skip re-verification.
+const idempotency = idempotencyMiddleware();
+app.use("/api/coinflip", idempotency);
+app.use("/api/dice", idempotency);
+app.use("/api/blackjack", idempotency);
+
 // Apply x402 payment middleware to game endpoints
 app.use("/api/coinflip", paymentMiddleware(paymentConfig));
 app.use("/api/dice", paymentMiddleware(paymentConfig));
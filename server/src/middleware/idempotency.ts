@@ -0,0 +1,132 @@
+/**
+ * Idempotent replay for paid game requests.
+ *
+ * Clients retry a paid POST when the response is lost (read timeout, dropped
+ * connection, 5xx from a proxy). Without dedupe the retry would play a second
+ * game — and pay out a second time — on the same payment. This middleware
+ * stores each successful response under its `Idempotency-Key` and replays it
+ * verbatim; concurrent retries wait for the first attempt instead of racing it.
+ *
+ * The payment side of the guard lives in claimPayment/releasePayment: the
+ * payment middleware claims each verified tx hash for one request, so the
+ * same payment proof cannot settle two games under different keys.
+ *
+ * In-memory like the rate limiter — no external deps, state is lost on restart.
+ */
+import crypto from "crypto";
+import { type Request, type Response, type NextFunction } from "express";
+
+interface StoredResponse {
+  fingerprint: string;
+  status?: number;
+  body?: unknown;
+  done: Promise<void>;
+  expiresAt: number;
+}
+
+export interface IdempotencyConfig {
+  ttlMs: number;         // How long a completed response can be replayed
+}
+
+const DEFAULT_CONFIG: IdempotencyConfig = {
+  ttlMs: 24 * 60 * 60_000,  // 24 hours
+};
+
+// Verified payment tx hash → owner (idempotency scope or one-off request id).
+// Never expires: a payment may settle exactly one game.
+const claimedPayments = new Map<string, string>();
+
+/** Claim a payment for one request. False if another request already used it. */
+export function claimPayment(txHash: string, owner: string): boolean {
+  const current = claimedPayments.get(txHash);
+  if (current !== undefined && current !== owner) return false;
+  claimedPayments.set(txHash, owner);
+  return true;
+}
+
+/** Give a claimed payment back, e.g. when its request was rejected before playing. */
+export function releasePayment(txHash: string, owner: string): void {
+  if (claimedPayments.get(txHash) === owner) claimedPayments.delete(txHash);
+}
+
+function fingerprintOf(req: Request): string {
+  return crypto.createHash("sha256").update(JSON.stringify(req.body ?? {})).digest("hex");
+}
+
+export function idempotencyMiddleware(config: Partial<IdempotencyConfig> = {}) {
+  const cfg = { ...DEFAULT_CONFIG, ...config };
+  const store = new Map<string, StoredResponse>();
+
+  // Cleanup expired entries every 5 minutes
+  setInterval(() => {
+    const now = Date.now();
+    for (const [key, entry] of store) {
+      if (now > entry.expiresAt) store.delete(key);
+    }
+  }, 5 * 60_000).unref();
+
+  return async (req: Request, res: Response, next: NextFunction): Promise<void> => {
+    const key = req.headers["idempotency-key"];
+    if (req.method !== "POST" || typeof key !== "string" || !key) {
+      next();
+      return;
+    }
+
+    // Echo the key so clients know retries of this request are safe
+    res.setHeader("Idempotency-Key", key);
+
+    const scope = `${req.baseUrl}:${key}`;
+    const fingerprint = fingerprintOf(req);
+
+    let existing: StoredResponse | undefined;
+    while ((existing = store.get(scope))) {
+      if (existing.fingerprint !== fingerprint) {
+        res.status(422).json({
+          error: "Idempotency-Key reused",
+          details: "This Idempotency-Key was already used with a different request body.",
+        });
+        return;
+      }
+      if (existing.status !== undefined) {
+        res.setHeader("Idempotent-Replayed", "true");
+        res.status(existing.status).json(existing.body);
+        return;
+      }
+      // First attempt still in flight — wait for it, then replay or take over if it failed
+      await existing.done;
+    }
+
+    let settle!: () => void;
+    const entry: StoredResponse = {
+      fingerprint,
+      done: new Promise<void>((resolve) => { settle = resolve; }),
+      expiresAt: Date.now() + cfg.ttlMs,
+    };
+    store.set(scope, entry);
+    (req as any).idempotencyScope = scope;
+
+    let completed = false;
+    const complete = () => {
+      if (completed) return;
+      completed = true;
+      // Only successful games are replayed; 402s and validation errors can be retried
+      if (entry.status === undefined) store.delete(scope);
+      settle();
+    };
+
+    const origJson = res.json.bind(res);
+    res.json = function (body: any) {
+      if (res.statusCode >= 200 && res.statusCode < 300) {
+        entry.status = res.statusCode;
+        entry.body = body;
+      }
+      complete();
+      return origJson(body);
+    } as any;
+    res.on("finish", complete);
+
+    next();
+  };
+}
+
+export default idempotencyMiddleware;
@@ -14,6 +14,7 @@
 import { type Request, type Response, type NextFunction } from "express";
 import crypto from "crypto";
 import { ethers } from "ethers";
+import { claimPayment, releasePayment } from "./idempotency.js";
 
 // ---- Swappable Payment Verifier Interface ----
 
@@ -333,6 +334,24 @@ export function paymentMiddleware(config: PaymentConfig) {
         return;
       }
 
+      // Replay guard: one payment settles one game. A retry of the same request
+      // (same Idempotency-Key) keeps its claim; any other request is refused.
+      if (result.txHash) {
+        const txHash = result.txHash;
+        const owner = (req as any).idempotencyScope || crypto.randomUUID();
+        if (!claimPayment(txHash, owner)) {
+          res.status(409).json({
+            error: "Payment already used",
+            details: `Transaction ${txHash} has already been used for another game`,
+          });
+          return;
+        }
+        // Hand the payment back if the game was never played (e.g. invalid bet)
+        res.on("finish", () => {
+          if (res.statusCode >= 300) releasePayment(txHash, owner);
+        });
+      }
+
       (req as any).payment = {
         verified: true,
         amount: betAmount,
@@ -0,0 +1,266 @@
+"""Columnar, vectorized analytics over game history.
+
+Columns are built in one pass over decoded history entries (nothing is kept
+per record but the packed values), or read straight into arrays from a
+columnar export (`clawsino export <path>.clwc`). Decoding JSON costs roughly
+2µs per record, so multi-million-record analysis should go through the
+columnar file.
+
+Requires NumPy (`pip install -e .[analytics]`).
+"""
+
+import mmap
+import struct
+from array import array
+from pathlib import Path
+
+from lib import export
+from lib.stats import is_win
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+GAME_CODES = {"coinflip": 0, "dice": 1, "blackjack": 2}
+GAME_NAMES = {code: name for name, code in GAME_CODES.items()}
+UNKNOWN_GAME = 255
+
+# Column name -> dtype. Money columns stay float64 so cumulative sums are exact
+# enough; everything else is packed into the smallest type that fits.
+COLUMNS = {
+    "timestamp": "float64",
+    "game": "uint8",
+    "bet": "float64",
+    "payout": "float64",
+    "won": "bool",
+    "target": "int8",   # dice target, -1 for other games
+    "outcome": "int8",  # dice total, -1 for other games
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("NumPy is required for analytics. Install with: pip install -e .[analytics]")
+
+
+def _dice_field(entry: dict, value) -> int:
+    return int(value) if entry.get("type") == "dice" and value is not None else -1
+
+
+# `array` typecodes for COLUMNS, so values are packed as they stream in
+_ARRAY_CODES = {"float64": "d", "uint8": "B", "bool": "B", "int8": "b"}
+
+
+def load_columns(entries) -> dict:
+    """Pack history entries (any iterable, e.g. a streaming decoder) into NumPy columns.
+
+    Each entry is read once and dropped; only the packed columns are kept.
+    """
+    _require_numpy()
+    bufs = {name: array(_ARRAY_CODES[dtype]) for name, dtype in COLUMNS.items()}
+    ts, game, bet, payout = bufs["timestamp"].append, bufs["game"].append, bufs["bet"].append, bufs["payout"].append
+    won, target, outcome = bufs["won"].append, bufs["target"].append, bufs["outcome"].append
+    for g in entries:
+        request = g.get("request") or {}
+        result = g.get("result") or {}
+        ts(g.get("timestamp", 0) or 0)
+        game(GAME_CODES.get(g.get("type"), UNKNOWN_GAME))
+        bet(request.get("bet", 0) or 0)
+        payout(result.get("payout", 0) or 0)
+        won(is_win(result))
+        target(_dice_field(g, request.get("target")))
+        outcome(_dice_field(g, result.get("total")))
+    return {name: np.frombuffer(buf, dtype=COLUMNS[name]) if len(buf) else np.empty(0, COLUMNS[name])
+            for name, buf in bufs.items()}
+
+
+# Columnar export typecode -> little-endian NumPy dtype
+_BIN_DTYPES = {"d": "<f8", "B": "u1", "b": "i1"}
+
+
+def _game_lookup():
+    # (first byte, length) of the type name -> game code
+    lut = np.full(256 * 16, UNKNOWN_GAME, dtype="uint8")
+    for name, code in GAME_CODES.items():
+        lut[name.encode()[0] * 16 + min(len(name), 15)] = code
+    return lut
+
+
+def _text_spans(offsets: list, bases: list) -> tuple:
+    """Absolute (starts, lengths) of every value in a text column, across row groups."""
+    lo = np.concatenate([o[:-1] for o in offsets])
+    hi = np.concatenate([o[1:] for o in offsets])
+    counts = np.fromiter((len(o) - 1 for o in offsets), dtype="int64", count=len(offsets))
+    starts = lo + np.repeat(np.array(bases, dtype="int64"), counts)
+    return starts, (hi - lo).astype("int64")
+
+
+def load_bin(path: str | Path) -> dict:
+    """Read a columnar export (`export --format bin`) straight into NumPy columns.
+
+    The file is memory-mapped; row groups are only indexed in Python, and all
+    decoding happens in whole-column NumPy operations, so unused text columns
+    (ids, picks, proofs) are never read.
+    """
+    _require_numpy()
+    with open(path, "rb") as fh:
+        columns = export.read_bin_header(fh)
+        start = fh.tell()
+    missing = {"type", "timestamp", "bet", "payout", "won", "target", "outcome"} - dict(columns).keys()
+    if missing:
+        raise ValueError(f"Columnar export is missing columns: {', '.join(sorted(missing))}")
+    if Path(path).stat().st_size == start:
+        return {name: np.empty(0, dtype) for name, dtype in COLUMNS.items()}
+
+    with open(path, "rb") as fh:
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    # Plain ndarray over the mapping; np.memmap's per-slice overhead adds up over row groups
+    buf = np.frombuffer(mapped, dtype="u1")
+    layout = [(name, code, np.dtype(_BIN_DTYPES.get(code, "<u4"))) for name, code in columns]
+    parts = {name: [] for name, code in columns if code != "s"}
+    text = {"type": ([], []), "outcome": ([], [])}
+    u32 = struct.Struct("<I").unpack_from
+    pos = start
+    while pos < len(buf):
+        (nrows,) = u32(mapped, pos)
+        pos += 4
+        for name, code, dtype in layout:
+            if code == "s":
+                end = pos + 4 * (nrows + 1)
+                if name in text:
+                    text[name][0].append(buf[pos:end].view(dtype))
+                    text[name][1].append(end)
+                (blob,) = u32(mapped, end - 4)
+                pos = end + blob
+            else:
+                end = pos + dtype.itemsize * nrows
+                if name in parts:
+                    parts[name].append(buf[pos:end].view(dtype))
+                pos = end
+
+    def byte_at(starts, shift=0):
+        return np.take(buf, starts + shift if shift else starts, mode="clip")
+
+    starts, lengths = _text_spans(*text["type"])
+    game = _game_lookup()[byte_at(starts).astype("uint16") * 16 + np.minimum(lengths, 15).astype("uint16")]
+    game[lengths == 0] = UNKNOWN_GAME
+    is_dice = game == GAME_CODES["dice"]
+
+    # Dice totals are stored as 1–2 digit text in the outcome column
+    starts, lengths = _text_spans(*text["outcome"])
+    total = byte_at(starts).astype("int16") - 48
+    two = lengths == 2
+    total[two] = total[two] * 10 + byte_at(starts[two], 1) - 48
+
+    cols = {name: np.concatenate(parts[name]) for name in ("timestamp", "bet", "payout")}
+    cols["won"] = np.concatenate(parts["won"]).view(bool)
+    cols["game"] = game
+    cols["target"] = np.where(is_dice, np.concatenate(parts["target"]), -1).astype("int8")
+    cols["outcome"] = np.where(is_dice & (lengths > 0) & (lengths <= 2), total, -1).astype("int8")
+    del buf
+    return {name: cols[name] for name in COLUMNS}
+
+
+def columns_nbytes(cols: dict) -> int:
+    return sum(a.nbytes for a in cols.values())
+
+
+# --- Queries ---
+
+def pnl(cols: dict):
+    return cols["payout"] - cols["bet"]
+
+
+def cumulative_pnl(cols: dict):
+    return np.cumsum(pnl(cols))
+
+
+def _cum_from_zero(cols: dict):
+    return np.concatenate(([0.0], cumulative_pnl(cols)))
+
+
+def rolling_pnl(cols: dict, window: int, cum=None):
+    """PnL over each trailing window of `window` games."""
+    if cum is None:
+        cum = _cum_from_zero(cols)
+    if window <= 0 or len(cum) <= window:
+        return cum[-1:] - cum[:1]
+    return cum[window:] - cum[:-window]
+
+
+def max_drawdown(cols: dict, cum=None) -> float:
+    """Largest peak-to-trough drop in cumulative PnL."""
+    if cum is None:
+        cum = _cum_from_zero(cols)
+    return float(np.max(np.maximum.accumulate(cum) - cum))
+
+
+def longest_streaks(cols: dict) -> dict:
+    """Longest consecutive win and loss runs."""
+    won = cols["won"]
+    if len(won) == 0:
+        return {"win": 0, "loss": 0}
+    # Run boundaries are where the outcome flips
+    starts = np.concatenate(([0], np.flatnonzero(won[1:] != won[:-1]) + 1))
+    lengths = np.diff(np.concatenate((starts, [len(won)])))
+    run_won = won[starts]
+    return {
+        "win": int(lengths[run_won].max(initial=0)),
+        "loss": int(lengths[~run_won].max(initial=0)),
+    }
+
+
+def payout_percentiles(cols: dict, percentiles=(50, 90, 99)) -> dict:
+    """Percentiles of the payout multiple (payout / bet) over paid bets."""
+    mask = cols["bet"] > 0
+    if not mask.any():
+        return {p: 0.0 for p in percentiles}
+    multiples = cols["payout"][mask] / cols["bet"][mask]
+    return dict(zip(percentiles, (float(v) for v in np.percentile(multiples, percentiles))))
+
+
+def realized_edge(cols: dict, window_seconds: float) -> list[dict]:
+    """Realized house edge per game type per time window.
+
+    Edge is 1 - payout / wagered, so a positive number means the house is up.
+    """
+    if len(cols["bet"]) == 0:
+        return []
+    buckets = (cols["timestamp"] // window_seconds).astype("int64")
+    first = int(buckets.min())
+    # Dense (window, game) index so bincount does the grouping without a sort
+    games = np.minimum(cols["game"], len(GAME_CODES)).astype("int64")
+    index = (buckets - first) * (len(GAME_CODES) + 1) + games
+    count = np.bincount(index)
+    wagered = np.bincount(index, weights=cols["bet"])
+    paid = np.bincount(index, weights=cols["payout"])
+
+    rows = []
+    for i in np.flatnonzero(count):
+        window, game = divmod(int(i), len(GAME_CODES) + 1)
+        w = float(wagered[i])
+        rows.append({
+            "window_start": float((first + window) * window_seconds),
+            "game": GAME_NAMES.get(game, "unknown"),
+            "games": int(count[i]),
+            "wagered": round(w, 4),
+            "edge": round(1 - float(paid[i]) / w, 4) if w else 0.0,
+        })
+    return rows
+
+
+def summary(cols: dict, window: int = 50) -> dict:
+    cum = _cum_from_zero(cols)
+    rolling = rolling_pnl(cols, window, cum)
+    return {
+        "games": int(len(cols["bet"])),
+        "total_pnl": round(float(cum[-1]), 4),
+        "rolling_window": window,
+        "rolling_pnl_last": round(float(rolling[-1]), 4) if len(rolling) else 0.0,
+        "rolling_pnl_min": round(float(rolling.min()), 4) if len(rolling) else 0.0,
+        "rolling_pnl_max": round(float(rolling.max()), 4) if len(rolling) else 0.0,
+        "max_drawdown": round(max_drawdown(cols, cum), 4),
+        "streaks": longest_streaks(cols),
+        "payout_percentiles": payout_percentiles(cols),
+    }
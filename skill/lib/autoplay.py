@@ -0,0 +1,257 @@
+"""Autoplay session engine — sustained betting with a strategy and risk limits.
+
+A strategy is a callable `strategy(state) -> float | None` returning the next
+bet amount (None stops the session). `state` holds the session so far:
+bets, wins, pnl, bankroll, last_bet, last_won, and the game spec.
+
+While one game resolves, the next bet's payment (402 probe + transfer) is
+prepared in parallel — but only when the next bet can't depend on the
+pending outcome and no stop limit (or the bankroll) could end the session on
+it, so a prepared payment is always used.
+"""
+
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lib import catalog, client
+from lib.stats import is_win
+
+
+def bet_data(game: dict, amount: float) -> dict:
+    """Build the request body for `game` (type plus choice/prediction/target)."""
+    if game["type"] == "coinflip":
+        return {"choice": game["choice"], "bet": amount}
+    if game["type"] == "dice":
+        return {"prediction": game["prediction"], "target": game["target"], "bet": amount}
+    return {"bet": amount}
+
+
+def _table_limits(game: dict) -> tuple[float, float]:
+    return catalog.bet_range(client.list_games(), game["type"])
+
+
+# --- Strategies ---
+
+def flat(amount: float):
+    """Same bet every time."""
+    def strategy(state: dict) -> float:
+        return amount
+    strategy.independent = True
+    return strategy
+
+
+def martingale(base: float, factor: float = 2.0):
+    """Multiply the bet by `factor` after each loss; reset to `base` after a win."""
+    def strategy(state: dict) -> float:
+        if state["last_won"] is False:
+            return state["last_bet"] * factor
+        return base
+    return strategy
+
+
+def kelly(fraction: float = 1.0):
+    """Bet `fraction` of the Kelly stake of the current bankroll.
+
+    Every Clawsino bet has negative expectation, so full Kelly is never
+    positive; the stake then falls back to the table minimum.
+    """
+    def strategy(state: dict) -> float:
+        game = state["game"]
+        lo, _ = _table_limits(game)
+        quote = catalog.preview(game["type"], bet_data(game, lo))
+        p, m = quote["win_probability"], quote["multiplier"]
+        if p is None or m <= 1:
+            return lo
+        edge = (p * m - 1) / (m - 1)
+        return max(lo, state["bankroll"] * edge * fraction)
+    return strategy
+
+
+def load_custom(spec: str):
+    """Load a strategy callable from 'module:function'."""
+    module_name, _, func_name = spec.partition(":")
+    if not func_name:
+        raise ValueError("Custom strategy must be given as 'module:function'")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def make_strategy(name: str, bet: float, fraction: float = 1.0):
+    if name == "flat":
+        return flat(bet)
+    if name == "martingale":
+        return martingale(bet)
+    if name == "kelly":
+        return kelly(fraction)
+    return load_custom(name)
+
+
+# --- Engine ---
+
+def _stop_reason(state: dict, limits: dict) -> str | None:
+    if limits.get("max_bets") is not None and state["bets"] >= limits["max_bets"]:
+        return "max_bets"
+    if limits.get("stop_loss") is not None and state["pnl"] <= -limits["stop_loss"]:
+        return "stop_loss"
+    if limits.get("take_profit") is not None and state["pnl"] >= limits["take_profit"]:
+        return "take_profit"
+    return None
+
+
+def _safe_to_prefetch(state: dict, amount: float, max_win: float, limits: dict) -> bool:
+    """True if no outcome of the pending bet can stop the session."""
+    if limits.get("max_bets") is not None and state["bets"] + 1 >= limits["max_bets"]:
+        return False
+    if limits.get("stop_loss") is not None and state["pnl"] - amount <= -limits["stop_loss"]:
+        return False
+    if limits.get("take_profit") is not None and state["pnl"] + max_win >= limits["take_profit"]:
+        return False
+    if state["bankroll"] - amount < amount:
+        return False  # a loss would leave too little to pay for the next bet
+    return True
+
+
+def _submitted_in_time(next_at: float) -> bool:
+    """True if a bet paid now would be submitted well inside its deadline.
+
+    A prefetched payment waits for the pending game and the rate limit; keep
+    that wait under half the deadline so retries still have time.
+    """
+    return next_at - time.time() <= client.BET_DEADLINE / 2
+
+
+def _apply_result(state: dict, amount: float, result: dict) -> None:
+    won = is_win(result)
+    payout = result.get("payout", 0) or 0
+    state["bets"] += 1
+    state["wins"] += 1 if won else 0
+    state["wagered"] += amount
+    state["pnl"] += payout - amount
+    state["bankroll"] += payout - amount
+    state["last_bet"] = amount
+    state["last_won"] = won
+    elapsed = time.time() - state["started"]
+    state["rate"] = state["bets"] / elapsed if elapsed > 0 else 0.0
+
+
+def run(
+    game: dict,
+    strategy,
+    bankroll: float = 10.0,
+    max_bets: int | None = None,
+    stop_loss: float | None = None,
+    take_profit: float | None = None,
+    max_rate: float | None = None,
+    on_bet=None,
+) -> dict:
+    """Run an autoplay session until a limit or the strategy stops it.
+
+    `on_bet(state, result)` is called after every game for live reporting.
+    """
+    endpoint = catalog.ENDPOINTS[game["type"]]
+    lo, hi = _table_limits(game)
+    limits = {"max_bets": max_bets, "stop_loss": stop_loss, "take_profit": take_profit}
+    interval = 1 / max_rate if max_rate else 0
+    independent = getattr(strategy, "independent", False)
+
+    state = {
+        "game": game, "bets": 0, "wins": 0, "pnl": 0.0, "wagered": 0.0,
+        "bankroll": bankroll, "last_bet": None, "last_won": None,
+        "started": time.time(), "rate": 0.0,
+    }
+    reason = None
+    prepared = None  # (data, future) for the next bet's payment
+    next_at = time.time()
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="clawsino-autoplay") as pool:
+        try:
+            while True:
+                reason = _stop_reason(state, limits)
+                if reason:
+                    break
+                amount = strategy(state)
+                if amount is None:
+                    reason = "strategy"
+                    break
+                amount = round(min(max(amount, lo), hi), 6)
+                if amount > state["bankroll"]:
+                    reason = "bankroll"
+                    break
+                data = bet_data(game, amount)
+                catalog.validate_bet(client.list_games(), game["type"], data)
+
+                # Rate limit before paying: a bet's deadline starts when it is prepared
+                delay = next_at - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                next_at = time.time() + interval
+
+                if prepared and prepared[0] == data:
+                    payment = prepared[1].result()
+                else:
+                    payment = client.prepare_payment(endpoint, data)
+                prepared = None
+
+                pending = pool.submit(client.submit_payment, endpoint, data, payment)
+
+                # Pipeline: pay for the next bet while this one resolves
+                max_win = catalog.preview(game["type"], data)["payout_if_win"] - amount
+                if game["type"] == "blackjack":
+                    max_win = amount * (catalog.BLACKJACK_NATURAL_MULTIPLIER - 1)
+                if (independent and _safe_to_prefetch(state, amount, max_win, limits)
+                        and _submitted_in_time(next_at)):
+                    prepared = (data, pool.submit(client.prepare_payment, endpoint, data))
+
+                try:
+                    result = pending.result()
+                except client.StrandedPaymentError as e:
+                    reason = "stranded"
+                    state["error"] = str(e)
+                    break
+                client._record_game(game["type"], data, result)
+                if result.get("error"):
+                    reason = "error"
+                    state["error"] = result.get("message", result["error"])
+                    break
+
+                _apply_result(state, amount, result)
+                if on_bet:
+                    on_bet(state, result)
+        except KeyboardInterrupt:
+            reason = "interrupted"
+        finally:
+            if prepared:
+                # Session stopped with a payment already made; play it rather than lose it
+                _settle_prepared(game["type"], prepared, state, on_bet)
+
+    elapsed = time.time() - state["started"]
+    return {
+        "bets": state["bets"],
+        "wins": state["wins"],
+        "wagered": round(state["wagered"], 6),
+        "pnl": round(state["pnl"], 6),
+        "bankroll": round(state["bankroll"], 6),
+        "elapsed": round(elapsed, 3),
+        "rate": round(state["bets"] / elapsed, 3) if elapsed > 0 else 0.0,
+        "stop_reason": reason,
+        "error": state.get("error"),
+    }
+
+
+def _settle_prepared(game_type: str, prepared: tuple, state: dict, on_bet=None) -> None:
+    """Play a bet whose payment was already made and count it in the session."""
+    data, future = prepared
+    try:
+        payment = future.result()
+        result = client.submit_payment(catalog.ENDPOINTS[game_type], data, payment)
+    except Exception as e:
+        import sys
+        print(f"⚠️  Could not settle prefetched bet {data}: {e}", file=sys.stderr)
+        return
+    client._record_game(game_type, data, result)
+    if result.get("error"):
+        state["error"] = result.get("message", result["error"])
+        return
+    _apply_result(state, data["bet"], result)
+    if on_bet:
+        on_bet(state, result)
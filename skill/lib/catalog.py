@@ -0,0 +1,139 @@
+"""Game catalog rules — local bet validation and payout preview.
+
+Mirrors the server's validation and payout math (server/src/routes/games.ts,
+server/src/games/*.ts) so bad bets are rejected before any 402 probe or
+onchain payment, and strategies can score bets without calling the server.
+"""
+
+import math
+from decimal import Decimal, ROUND_HALF_UP
+
+# Probability of each 2d6 total (in 36ths)
+DICE_WAYS = {2: 1, 3: 2, 4: 3, 5: 4, 6: 5, 7: 6, 8: 5, 9: 4, 10: 3, 11: 2, 12: 1}
+HOUSE_EDGE = 0.02
+COINFLIP_MULTIPLIER = 1.96
+BLACKJACK_MULTIPLIER = 2.0
+BLACKJACK_NATURAL_MULTIPLIER = 2.5
+
+# Game id -> POST endpoint that plays it
+ENDPOINTS = {
+    "coinflip": "/api/coinflip",
+    "dice": "/api/dice",
+    "blackjack": "/api/blackjack",
+}
+
+# Used when the server catalog is unreachable; same shape as GET /api/games
+FALLBACK_CATALOG = {
+    "games": [
+        {
+            "id": "coinflip",
+            "name": "Coin Flip",
+            "description": "Pick heads or tails. 1.96x payout (2% house edge).",
+            "endpoint": "POST /api/coinflip",
+            "odds": "50/50, 1.96x payout",
+            "betRange": {"min": 0.01, "max": 1.0, "currency": "USDC"},
+        },
+        {
+            "id": "dice",
+            "name": "Dice Roll (2d6)",
+            "description": "Predict if the total of 2d6 will be over or under your target.",
+            "endpoint": "POST /api/dice",
+            "odds": "Variable — depends on target and prediction",
+            "betRange": {"min": 0.01, "max": 1.0, "currency": "USDC"},
+        },
+        {
+            "id": "blackjack",
+            "name": "Blackjack",
+            "description": "Single-hand blackjack. Auto-plays basic strategy (hit < 17).",
+            "endpoint": "POST /api/blackjack",
+            "odds": "~49% win rate, 2x on win, 2.5x on blackjack",
+            "betRange": {"min": 0.1, "max": 5.0, "currency": "USDC"},
+        },
+    ]
+}
+
+
+def _js_round(value: float, digits: int) -> float:
+    """Round like JS `parseFloat(x.toFixed(digits))` (exact ties round up)."""
+    quantum = Decimal(1).scaleb(-digits)
+    return float(Decimal(value).quantize(quantum, rounding=ROUND_HALF_UP))
+
+
+def dice_win_probability(prediction: str, target: int) -> float:
+    if prediction == "over":
+        ways = sum(w for total, w in DICE_WAYS.items() if total > target)
+    else:
+        ways = sum(w for total, w in DICE_WAYS.items() if total < target)
+    return ways / 36
+
+
+def dice_multiplier(prediction: str, target: int) -> float:
+    """Payout multiplier for a dice bet; 0 if the bet can never win."""
+    prob = dice_win_probability(prediction, target)
+    if prob <= 0:
+        return 0.0
+    return _js_round((1 / prob) * (1 - HOUSE_EDGE), 4)
+
+
+def bet_range(catalog: dict, game_id: str) -> tuple[float, float]:
+    for game in catalog.get("games", []):
+        if game.get("id") == game_id:
+            rng = game.get("betRange") or {}
+            if "min" in rng and "max" in rng:
+                return float(rng["min"]), float(rng["max"])
+    for game in FALLBACK_CATALOG["games"]:
+        if game["id"] == game_id:
+            return game["betRange"]["min"], game["betRange"]["max"]
+    raise ValueError(f"Unknown game '{game_id}'")
+
+
+def validate_bet(catalog: dict, game_id: str, data: dict) -> None:
+    """Raise ValueError if the server would reject this bet."""
+    bet = data.get("bet")
+    if not isinstance(bet, (int, float)) or not math.isfinite(bet):
+        raise ValueError("Bet must be a number.")
+    lo, hi = bet_range(catalog, game_id)
+    if bet < lo or bet > hi:
+        raise ValueError(f"Bet must be between {lo:.2f} and {hi:.2f} USDC for {game_id}.")
+
+    if game_id == "coinflip":
+        if data.get("choice") not in ("heads", "tails"):
+            raise ValueError('Choice must be "heads" or "tails".')
+    elif game_id == "dice":
+        prediction = data.get("prediction")
+        target = data.get("target")
+        if prediction not in ("over", "under"):
+            raise ValueError('Prediction must be "over" or "under".')
+        if not isinstance(target, int) or isinstance(target, bool) or not 2 <= target <= 12:
+            raise ValueError("Target must be an integer between 2 and 12.")
+        if dice_multiplier(prediction, target) == 0:
+            raise ValueError(f"Impossible bet — {prediction} {target} can never win.")
+
+
+def preview(game_id: str, data: dict) -> dict:
+    """Exact payout multiplier, win probability and expected value for a bet.
+
+    Blackjack has no closed-form win probability, so it is reported as None.
+    """
+    bet = data.get("bet", 0)
+    if game_id == "coinflip":
+        multiplier, prob = COINFLIP_MULTIPLIER, 0.5
+    elif game_id == "dice":
+        prob = dice_win_probability(data["prediction"], data["target"])
+        multiplier = dice_multiplier(data["prediction"], data["target"])
+    elif game_id == "blackjack":
+        multiplier, prob = BLACKJACK_MULTIPLIER, None
+    else:
+        raise ValueError(f"Unknown game '{game_id}'")
+
+    result = {
+        "game": game_id,
+        "bet": bet,
+        "multiplier": multiplier,
+        "win_probability": prob,
+        "payout_if_win": _js_round(bet * multiplier, 6),
+        "expected_value": round(bet * (multiplier * prob - 1), 6) if prob is not None else None,
+    }
+    if game_id == "blackjack":
+        result["payout_if_natural"] = _js_round(bet * BLACKJACK_NATURAL_MULTIPLIER, 6)
+    return result
@@ -0,0 +1,224 @@
+"""Tamper-evident hash chain and Merkle checkpoints over local game history.
+
+Every recorded entry gets a global `seq`, the `prev_hash` of the entry before
+it, and its own `hash` = SHA-256 of its canonical JSON (which includes
+`prev_hash`). Every BLOCK_SIZE entries a checkpoint stores the block's Merkle
+tree, and checkpoint roots are themselves chained into an `anchor`.
+
+That gives two cheap checks:
+- one record: rehash it and walk its Merkle path to the checkpoint root,
+  O(log n) hashes;
+- the whole log: rehash every retained entry (history is capped, so this is
+  a few hundred hashes) and check links and checkpoint leaves; Merkle trees
+  are only rebuilt for blocks newer than the last verified checkpoint.
+
+This detects edits to history.json; it cannot stop someone who rewrites
+both history.json and chain.json consistently.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CHAIN_DIR = Path.home() / ".openclaw" / "clawsino"
+CHAIN_FILE = CHAIN_DIR / "chain.json"
+
+GENESIS = "0" * 64
+BLOCK_SIZE = 64
+CHAIN_FIELDS = ("hash",)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def canonical_json(entry: dict) -> bytes:
+    body = {k: v for k, v in entry.items() if k not in CHAIN_FIELDS}
+    return json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def entry_hash(entry: dict) -> str:
+    return _sha256(canonical_json(entry))
+
+
+# --- Merkle ---
+
+def _parent(left: str, right: str) -> str:
+    return _sha256(bytes.fromhex(left) + bytes.fromhex(right))
+
+
+def merkle_levels(leaves: list[str]) -> list[list[str]]:
+    """All tree levels, leaves first, root last. Odd nodes are paired with themselves."""
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        levels.append([
+            _parent(level[i], level[i + 1] if i + 1 < len(level) else level[i])
+            for i in range(0, len(level), 2)
+        ])
+    return levels
+
+
+def merkle_path_root(leaf: str, index: int, levels: list[list[str]]) -> str:
+    """Hash `leaf` up to the root using sibling nodes from stored levels."""
+    node = leaf
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        other = level[sibling] if sibling < len(level) else level[index]
+        node = _parent(node, other) if index % 2 == 0 else _parent(other, node)
+        index //= 2
+    return node
+
+
+# --- State ---
+
+def empty_state() -> dict:
+    return {"head": {"seq": -1, "hash": GENESIS}, "anchor": GENESIS, "checkpoints": [], "verified_seq": -1}
+
+
+def load_state() -> dict:
+    if CHAIN_FILE.exists():
+        return json.loads(CHAIN_FILE.read_text())
+    return empty_state()
+
+
+def save_state(state: dict) -> None:
+    CHAIN_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CHAIN_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    tmp.replace(CHAIN_FILE)
+
+
+def _checkpoint_for(state: dict, seq: int) -> dict | None:
+    block = seq // BLOCK_SIZE
+    for cp in state["checkpoints"]:
+        if cp["block"] == block:
+            return cp
+    return None
+
+
+# --- Writing ---
+
+def link(history: list[dict], entries: list[dict], state: dict) -> None:
+    """Chain `entries` onto the end of `history`, checkpointing full blocks.
+
+    Entries are modified in place; the caller appends them and saves state.
+    """
+    head = state["head"]
+    by_seq = {g["seq"]: g["hash"] for g in history[-BLOCK_SIZE:] if "seq" in g}
+    for entry in entries:
+        entry["seq"] = head["seq"] + 1
+        entry["prev_hash"] = head["hash"]
+        entry["hash"] = entry_hash(entry)
+        head = {"seq": entry["seq"], "hash": entry["hash"]}
+        by_seq[entry["seq"]] = entry["hash"]
+
+        if (entry["seq"] + 1) % BLOCK_SIZE == 0:
+            first = entry["seq"] + 1 - BLOCK_SIZE
+            leaves = [by_seq.get(s) for s in range(first, entry["seq"] + 1)]
+            if None in leaves:
+                continue  # Block started before chaining was enabled
+            levels = merkle_levels(leaves)
+            root = levels[-1][0]
+            state["anchor"] = _sha256(bytes.fromhex(state["anchor"]) + bytes.fromhex(root))
+            state["checkpoints"].append({
+                "block": first // BLOCK_SIZE,
+                "root": root,
+                "anchor": state["anchor"],
+                "levels": levels,
+            })
+    state["head"] = head
+
+
+def prune(state: dict, history: list[dict]) -> None:
+    """Drop Merkle levels for blocks no longer present in retained history."""
+    oldest = next((g["seq"] for g in history if "seq" in g), None)
+    if oldest is None:
+        return
+    for cp in state["checkpoints"]:
+        if (cp["block"] + 1) * BLOCK_SIZE <= oldest:
+            cp.pop("levels", None)
+
+
+# --- Verification ---
+
+def verify_record(history: list[dict], index: int, state: dict) -> tuple[bool, str]:
+    """Verify one history entry in O(log n) hashes."""
+    entry = history[index]
+    if "hash" not in entry:
+        return False, "entry predates the hash chain"
+    if entry_hash(entry) != entry["hash"]:
+        return False, "entry contents do not match its hash"
+
+    cp = _checkpoint_for(state, entry["seq"])
+    if cp and cp.get("levels"):
+        position = entry["seq"] % BLOCK_SIZE
+        if merkle_path_root(entry["hash"], position, cp["levels"]) != cp["root"]:
+            return False, f"Merkle path does not reach checkpoint root (block {cp['block']})"
+        return True, f"Merkle path verified against checkpoint {cp['block']}"
+
+    # Open block — check links forward to the recorded chain head
+    for prev, cur in zip(history[index:], history[index + 1:]):
+        if cur.get("prev_hash") != prev.get("hash"):
+            return False, f"chain broken after seq {prev.get('seq')}"
+    if history[-1].get("hash") != state["head"]["hash"]:
+        return False, "history head does not match recorded chain head"
+    return True, "linked to current chain head"
+
+
+def verify_log(history: list[dict], state: dict, full: bool = False) -> dict:
+    """Verify the whole log.
+
+    Every retained entry is rehashed, since its stored `hash` is what links and
+    checkpoint leaves are compared against. Checkpoint Merkle trees are only
+    rebuilt for blocks after the last verified one, unless `full`.
+    """
+    errors = []
+    rehashed = 0
+    legacy = 0
+    from_seq = -1 if full else state.get("verified_seq", -1)
+    checkpoints = {cp["block"]: cp for cp in state["checkpoints"]}
+    prev = None
+
+    for entry in history:
+        if "hash" not in entry:
+            legacy += 1
+            continue
+        seq = entry["seq"]
+        if prev is not None and entry.get("prev_hash") != prev["hash"]:
+            errors.append(f"seq {seq}: prev_hash does not link to seq {prev['seq']}")
+        rehashed += 1
+        if entry_hash(entry) != entry["hash"]:
+            errors.append(f"seq {seq} ({entry.get('id')}): contents do not match hash")
+        cp = checkpoints.get(seq // BLOCK_SIZE)
+        if cp and cp.get("levels") and cp["levels"][0][seq % BLOCK_SIZE] != entry["hash"]:
+            errors.append(f"seq {seq}: hash differs from checkpoint {cp['block']}")
+        prev = entry
+
+    if prev is not None and prev["hash"] != state["head"]["hash"]:
+        errors.append("history head does not match recorded chain head")
+
+    anchor = GENESIS
+    for cp in state["checkpoints"]:
+        anchor = _sha256(bytes.fromhex(anchor) + bytes.fromhex(cp["root"]))
+        if anchor != cp["anchor"]:
+            errors.append(f"checkpoint {cp['block']}: anchor chain broken")
+            break
+        fresh = (cp["block"] + 1) * BLOCK_SIZE - 1 > from_seq
+        if fresh and cp.get("levels") and merkle_levels(cp["levels"][0])[-1][0] != cp["root"]:
+            errors.append(f"checkpoint {cp['block']}: Merkle tree does not match root")
+
+    ok = not errors
+    if ok and prev is not None:
+        # Next run only needs to rebuild Merkle trees after the last full block
+        last_cp = state["checkpoints"][-1]["block"] if state["checkpoints"] else -1
+        state["verified_seq"] = max(state.get("verified_seq", -1), (last_cp + 1) * BLOCK_SIZE - 1)
+    return {
+        "ok": ok,
+        "entries": len(history),
+        "rehashed": rehashed,
+        "unchained": legacy,
+        "checkpoints": len(state["checkpoints"]),
+        "errors": errors,
+    }
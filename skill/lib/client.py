@@ -1,42 +1,213 @@
 """API client for the Clawsino game server."""
 
 import json
+import os
+import random
+import threading
 import time
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows — history writes are only serialized within a process
+    fcntl = None
+
 import requests
+import urllib3
 
+from lib import catalog, chain, http_cache, records, stats, stranded
 from lib.wallet import get_server_url, get_address, get_account, transfer_usdc, get_usdc_balance, get_rpc_url
 
 HISTORY_DIR = Path.home() / ".openclaw" / "clawsino"
 HISTORY_FILE = HISTORY_DIR / "history.json"
+HISTORY_LOCK = HISTORY_DIR / "history.lock"
+MAX_HISTORY = 500
+
+# Overall time budget for one bet — 402 probe, payment, submit and all retries
+BET_DEADLINE = float(os.environ.get("CLAWSINO_BET_DEADLINE", "60"))
+REQUEST_TIMEOUT = 30.0
+RETRY_BASE_DELAY = 0.25
+RETRY_MAX_DELAY = 4.0
+# Don't start an onchain transfer with less time than this left to submit it
+MIN_PAY_BUDGET = 5.0
+
+
+class StrandedPaymentError(Exception):
+    """A bet was paid for onchain but no game result arrived before its deadline."""
+
+    def __init__(self, entry: dict):
+        self.entry = entry
+        super().__init__(
+            f"Paid bet {entry['idempotency_key']} got no result before its deadline "
+            f"(tx {entry.get('tx_hash')}); run 'clawsino reconcile' to resubmit it"
+        )
 
 
 def _load_history() -> list[dict]:
     if HISTORY_FILE.exists():
-        return json.loads(HISTORY_FILE.read_text())
+        return records.loads(HISTORY_FILE.read_bytes())
     return []
 
 
 def _save_history(history: list[dict]) -> None:
     HISTORY_DIR.mkdir(parents=True, exist_ok=True)
-    HISTORY_FILE.write_text(json.dumps(history, indent=2))
-
-
-def _record_game(game_type: str, request_data: dict, response_data: dict) -> None:
-    history = _load_history()
+    tmp = HISTORY_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(history, indent=2))
+    tmp.replace(HISTORY_FILE)
+
+
+_history_rlock = threading.RLock()
+_history_lock_depth = 0
+
+
+@contextmanager
+def _locked_history():
+    """Serialize history read-modify-write across threads and processes (e.g. the outbox worker)."""
+    global _history_lock_depth
+    with _history_rlock:
+        fd = None
+        if _history_lock_depth == 0 and fcntl is not None:
+            HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+            fd = os.open(HISTORY_LOCK, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        _history_lock_depth += 1
+        try:
+            yield
+        finally:
+            _history_lock_depth -= 1
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+
+def _history_truncated(history) -> bool:
+    """True if older games have been trimmed out of the retained history."""
+    first = min((g.get("seq") for g in history if g.get("seq") is not None), default=None)
+    if first is not None:
+        return first > 0
+    return len(history) >= MAX_HISTORY
+
+
+def _load_aggregates(history: list[dict]) -> dict:
+    """Load persisted aggregates, rebuilding them if missing or outdated."""
+    agg = stats.load_aggregates()
+    if agg is None:
+        agg = stats.rebuild(history, partial=_history_truncated(history))
+        stats.reset_counted([g.get("id") for g in history if g.get("id")])
+    return agg
+
+
+def _counted_ids(history: list[dict]) -> set[str]:
+    counted = stats.load_counted()
+    if counted is None:
+        # Aggregates predate ID tracking; at least the retained games are in them
+        counted = {g.get("id") for g in history if g.get("id")}
+        stats.reset_counted(sorted(counted))
+    return counted
+
+
+def _append_entries(entries: list[dict], history: list[dict] | None = None,
+                    counted: set[str] | None = None) -> None:
+    """Append entries to history and fold them into the running aggregates.
+
+    Entries whose IDs are in `counted` are stored but not counted again.
+    """
+    with _locked_history():
+        if history is None:
+            history = _load_history()
+        agg = _load_aggregates(history)
+        chain_state = chain.load_state()
+        chain.link(history, entries, chain_state)
+        history.extend(entries)
+        # Keep last 500 games
+        if len(history) > MAX_HISTORY:
+            history = history[-MAX_HISTORY:]
+        chain.prune(chain_state, history)
+        _save_history(history)
+        chain.save_state(chain_state)
+        # Aggregates cover every recorded game, not just the retained window
+        fold = [e for e in entries if not counted or e.get("id") not in counted]
+        for entry in fold:
+            stats.apply_game(agg, records.GameRecord.from_dict(entry))
+        stats.save_aggregates(agg)
+        stats.mark_counted([e["id"] for e in fold if e.get("id")])
+
+
+def _record_game(game_type: str, request_data: dict, response_data: dict, **fields) -> None:
+    """Record one game; extra `fields` (e.g. outbox_key) are stored on the entry."""
     entry = {
         "id": response_data.get("game_id", f"{game_type}_{int(time.time())}"),
         "type": game_type,
         "timestamp": time.time(),
         "request": request_data,
         "result": response_data,
+        **fields,
     }
-    history.append(entry)
-    # Keep last 500 games
-    if len(history) > 500:
-        history = history[-500:]
-    _save_history(history)
+    _append_entries([entry])
+
+
+def merge_records(entries: list[dict]) -> tuple[list[dict], int]:
+    """Merge externally sourced entries into history, skipping known game IDs.
+
+    New entries are chained after the existing tail, so they can only make
+    room by evicting the oldest retained entries. A backfilled entry is kept
+    only if there is room or it is newer than the entry it would evict; older
+    ones are counted in the running aggregates but not stored. Games already
+    counted (e.g. played here, then trimmed from history) are never counted
+    again.
+
+    Returns (entries added to history, number only counted in aggregates).
+    """
+    with _locked_history():
+        history = _load_history()
+        counted = _counted_ids(history)
+        known = {g.get("id") for g in history}
+        new = []
+        for entry in entries:
+            if entry.get("id") not in known:
+                known.add(entry.get("id"))
+                new.append(entry)
+
+        new.sort(key=lambda e: e.get("timestamp") or 0, reverse=True)
+        room = MAX_HISTORY - len(history)
+        evicted = 0
+        keep = []
+        for entry in new:
+            if room > 0:
+                room -= 1
+            elif evicted < len(history) and (history[evicted].get("timestamp") or 0) < (entry.get("timestamp") or 0):
+                evicted += 1
+            else:
+                break  # the rest are older still
+            keep.append(entry)
+        dropped = [e for e in new[len(keep):] if e.get("id") not in counted]
+        keep.reverse()
+
+        if keep:
+            _append_entries(keep, history, counted)
+        if dropped:
+            agg = _load_aggregates(_load_history())
+            for entry in dropped:
+                stats.apply_game(agg, records.GameRecord.from_dict(entry))
+            stats.save_aggregates(agg)
+            stats.mark_counted([e["id"] for e in dropped])
+    return keep, len(dropped)
+
+
+_session: requests.Session | None = None
+
+
+def get_session() -> requests.Session:
+    """Shared pooled HTTP session for bulk and long-running requests."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
 
 
 def _build_headers() -> dict:
@@ -45,11 +216,13 @@ def _build_headers() -> dict:
     address = get_address()
     if address:
         headers["X-Payer-Address"] = address
+        # Server attributes dev-mode games (and per-wallet history) by X-Wallet
+        headers["X-Wallet"] = address
     return headers
 
 
-def _handle_402_onchain(resp_json: dict, data: dict, url: str, headers: dict) -> requests.Response | None:
-    """Handle 402 by making a real on-chain USDC transfer. Returns retry response or None."""
+def _pay_onchain(resp_json: dict) -> str | None:
+    """Make the on-chain USDC transfer a 402 asks for. Returns the tx hash or None."""
     reqs = resp_json.get("paymentRequirements", [])
     if not reqs:
         return None
@@ -63,6 +236,7 @@ def _handle_402_onchain(resp_json: dict, data: dict, url: str, headers: dict) ->
         return None
 
     amount = float(amount_str)
+    http_cache.check_payment_addresses(extra)
     # Prefer client's configured RPC (server may return Docker-internal hostname)
     rpc_url = get_rpc_url()
     if rpc_url == "https://mainnet.base.org":
@@ -74,53 +248,205 @@ def _handle_402_onchain(resp_json: dict, data: dict, url: str, headers: dict) ->
         tx_hash = transfer_usdc(pay_to, amount, rpc_url=rpc_url, usdc_address=usdc_address)
         if not tx_hash.startswith("0x"):
             tx_hash = "0x" + tx_hash
-        headers["X-PAYMENT"] = f"x402:tx:{tx_hash}"
-        return requests.post(url, json=data, headers=headers, timeout=30)
+        return tx_hash
     except Exception as e:
         import sys
         print(f"⚠️  On-chain payment failed: {e}", file=sys.stderr)
         return None
 
 
-def _post(endpoint: str, data: dict) -> dict:
-    """POST to the game server with automatic payment handling."""
+def _remaining(deadline: float) -> float:
+    return deadline - time.monotonic()
+
+
+def _never_delivered(error: Exception) -> bool:
+    """True if the request provably never reached the server (no connection was made)."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+
+
+def _post_with_retries(
+    url: str,
+    data: dict,
+    headers: dict,
+    deadline: float,
+    replay_safe: bool = True,
+) -> requests.Response:
+    """POST the same request until it gets a non-5xx response or the deadline passes.
+
+    Connection errors, timeouts and 5xx responses are retried with full-jitter
+    exponential backoff; each attempt's timeout is capped by the time left.
+    With replay_safe=False (a paid request the server does not dedupe) only
+    requests that never reached the server are resent — a read timeout or 5xx
+    may mean the game was played, and a resend would play it again.
+    """
+    attempt = 0
+    while True:
+        remaining = _remaining(deadline)
+        if remaining <= 0:
+            raise requests.exceptions.Timeout(f"Bet deadline passed after {attempt} attempt(s)")
+        try:
+            resp = requests.post(url, json=data, headers=headers, timeout=min(REQUEST_TIMEOUT, remaining))
+            if resp.status_code < 500:
+                return resp
+            error: Exception = requests.exceptions.HTTPError(f"{resp.status_code} Server Error", response=resp)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+        if not replay_safe and not _never_delivered(error):
+            raise error
+        attempt += 1
+        delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        if delay >= _remaining(deadline):
+            raise error
+        time.sleep(delay)
+
+
+def _dev_payment_header() -> str:
+    import hashlib
+    tx_hash = hashlib.sha256(f"{time.time()}".encode()).hexdigest()
+    return f"x402:dev:{tx_hash}"
+
+
+def prepare_payment(
+    endpoint: str,
+    data: dict,
+    idempotency_key: str | None = None,
+    deadline: float = BET_DEADLINE,
+) -> dict:
+    """Step 1 of a paid POST: probe for the 402 and pay it.
+
+    Returns {"headers": ...} carrying the X-PAYMENT proof to submit with, or
+    {"result": ...} if the server played the game without asking for payment
+    (dev mode). Either way the dict also carries the bet's `idempotency_key`,
+    its `deadline` (time.monotonic() by which the bet must resolve) and
+    `replay_safe` — whether the server echoed the key, i.e. dedupes retries.
+    """
     url = f"{get_server_url()}{endpoint}"
-    headers = _build_headers()
+    key = idempotency_key or uuid.uuid4().hex
+    expires = time.monotonic() + deadline
+    headers = {**_build_headers(), "Idempotency-Key": key}
+
+    # The probe carries no payment, so it is always safe to resend
+    resp = _post_with_retries(url, data, headers, expires)
+    base = {
+        "idempotency_key": key,
+        "deadline": expires,
+        "replay_safe": resp.headers.get("Idempotency-Key") == key,
+    }
+    if resp.status_code != 402:
+        resp.raise_for_status()
+        return {**base, "result": resp.json()}
 
-    resp = requests.post(url, json=data, headers=headers, timeout=30)
+    resp_json = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else {}
 
-    # Handle 402 Payment Required
-    if resp.status_code == 402:
-        resp_json = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else {}
+    # Check if server is in onchain mode
+    reqs = resp_json.get("paymentRequirements", [])
+    is_onchain = reqs and reqs[0].get("extra", {}).get("mode") == "onchain"
 
-        # Check if server is in onchain mode
-        reqs = resp_json.get("paymentRequirements", [])
-        is_onchain = reqs and reqs[0].get("extra", {}).get("mode") == "onchain"
+    if is_onchain:
+        if _remaining(expires) < MIN_PAY_BUDGET:
+            # Nothing spent yet — fail now rather than pay with no time left to play
+            raise requests.exceptions.Timeout("Bet deadline too close to start an onchain payment")
+        tx_hash = _pay_onchain(resp_json)
+        if tx_hash:
+            return {**base, "headers": {**headers, "X-PAYMENT": f"x402:tx:{tx_hash}"}, "tx_hash": tx_hash}
+        # Fall through to dev payment if onchain failed
 
-        if is_onchain:
-            retry = _handle_402_onchain(resp_json, data, url, headers)
-            if retry and retry.status_code != 402:
-                retry.raise_for_status()
-                return retry.json()
-            # Fall through to dev payment if onchain failed
+    return {**base, "headers": {**headers, "X-PAYMENT": _dev_payment_header()}}
 
-        # Fallback: dev payment header
-        import hashlib
-        tx_hash = hashlib.sha256(f"{time.time()}".encode()).hexdigest()
-        headers["X-PAYMENT"] = f"x402:dev:{tx_hash}"
-        resp = requests.post(url, json=data, headers=headers, timeout=30)
-        if resp.status_code == 402:
-            payment_info = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else {}
-            return {
-                "error": "payment_required",
-                "message": "Payment required — could not complete payment",
-                "payment_info": payment_info,
-            }
+
+def submit_payment(endpoint: str, data: dict, payment: dict) -> dict:
+    """Step 2 of a paid POST: send the request with the payment proof from prepare_payment.
+
+    Transient failures are retried until the bet's deadline with the same
+    X-PAYMENT proof and Idempotency-Key, never a new payment. Unless the
+    server dedupes by that key (`replay_safe`), only requests that never
+    reached it are resent. If an onchain payment still gets no result, it is
+    recorded in the stranded ledger and StrandedPaymentError is raised.
+    """
+    if "result" in payment:
+        return payment["result"]
+
+    url = f"{get_server_url()}{endpoint}"
+    headers = payment["headers"]
+    deadline = payment.get("deadline") or time.monotonic() + BET_DEADLINE
+    replay_safe = payment.get("replay_safe", False)
+    try:
+        resp = _post_with_retries(url, data, headers, deadline, replay_safe)
+        if resp.status_code == 402 and payment.get("tx_hash"):
+            # Fall back to dev payment if the onchain proof was rejected
+            headers = {**headers, "X-PAYMENT": _dev_payment_header()}
+            resp = _post_with_retries(url, data, headers, deadline, replay_safe)
+    except requests.exceptions.RequestException as e:
+        if not payment.get("tx_hash"):
+            raise
+        game_type = endpoint.rsplit("/", 1)[-1]
+        entry = stranded.record(game_type, endpoint, data, payment, str(e), delivered=not _never_delivered(e))
+        raise StrandedPaymentError(entry) from e
+    if resp.status_code == 402:
+        payment_info = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else {}
+        return {
+            "error": "payment_required",
+            "message": "Payment required — could not complete payment",
+            "payment_info": payment_info,
+        }
 
     resp.raise_for_status()
     return resp.json()
 
 
+def _post(endpoint: str, data: dict) -> dict:
+    """POST to the game server with automatic payment handling."""
+    return submit_payment(endpoint, data, prepare_payment(endpoint, data))
+
+
+def reconcile(deadline: float = BET_DEADLINE) -> list[dict]:
+    """Resubmit stranded payments with their original proof and idempotency key.
+
+    Games that come back are recorded and dropped from the ledger. A payment
+    whose request may have reached a server that does not dedupe retries is
+    not resubmitted — that could play the game twice — and is reported as an
+    error instead. Returns one {"entry", "result"} or {"entry", "error"} per
+    stranded payment.
+    """
+    outcomes = []
+    for key, entry in stranded.load().items():
+        replay_safe = entry.get("replay_safe", False)
+        if not replay_safe and entry.get("delivered", True):
+            outcomes.append({
+                "entry": entry,
+                "error": "request may have been played and the server does not dedupe retries — "
+                         "check history, then drop it",
+            })
+            continue
+        payment = {
+            "headers": entry["headers"],
+            "tx_hash": entry.get("tx_hash"),
+            "idempotency_key": key,
+            "deadline": time.monotonic() + deadline,
+            "replay_safe": replay_safe,
+        }
+        try:
+            result = submit_payment(entry["endpoint"], entry["request"], payment)
+        except StrandedPaymentError as e:
+            outcomes.append({"entry": e.entry, "error": e.entry["last_error"]})
+            continue
+        except requests.exceptions.HTTPError as e:
+            outcomes.append({"entry": entry, "error": str(e)})
+            continue
+        if result.get("error"):
+            outcomes.append({"entry": entry, "error": result.get("message", result["error"])})
+            continue
+        _record_game(entry["type"], entry["request"], result)
+        stranded.resolve(key)
+        outcomes.append({"entry": entry, "result": result})
+    return outcomes
+
+
 def demo_post(endpoint: str, data: dict) -> dict:
     """Two-step x402 demo flow. Returns structured trace of the full negotiation."""
     url = f"{get_server_url()}{endpoint}"
@@ -149,6 +475,7 @@ def demo_post(endpoint: str, data: dict) -> dict:
         pay_to = req.get("payTo", "")
         amount = float(req.get("maxAmountRequired", "0"))
         extra = req.get("extra", {})
+        http_cache.check_payment_addresses(extra)
         # Prefer client's configured RPC (server may return Docker-internal hostname)
         rpc_url = get_rpc_url()
         if rpc_url == "https://mainnet.base.org":
@@ -192,10 +519,26 @@ def _get(endpoint: str, params: dict | None = None) -> dict:
 
 # --- Game API ---
 
+def validate_bet(game_type: str, data: dict, offline: bool = False) -> None:
+    """Check a bet against the cached catalog before any network or chain work.
+
+    offline=True never fetches: it uses whatever catalog is cached, however
+    stale, or the local fallback.
+    """
+    catalog.validate_bet(cached_games() if offline else list_games(), game_type, data)
+
+
+def preview_bet(game_type: str, data: dict, offline: bool = False) -> dict:
+    """Validate a bet and return its exact payout multiplier and expected value."""
+    validate_bet(game_type, data, offline)
+    return catalog.preview(game_type, data)
+
+
 def play_coinflip(choice: str, amount: float) -> dict:
     """Play coinflip. choice: 'heads' or 'tails'."""
     data = {"choice": choice.lower(), "bet": amount}
-    result = _post("/api/coinflip", data)
+    validate_bet("coinflip", data)
+    result = _post(catalog.ENDPOINTS["coinflip"], data)
     _record_game("coinflip", data, result)
     return result
 
@@ -203,7 +546,8 @@ def play_coinflip(choice: str, amount: float) -> dict:
 def play_dice(prediction: str, target: int, amount: float) -> dict:
     """Play dice. prediction: 'over' or 'under', target: number."""
     data = {"prediction": prediction.lower(), "target": target, "bet": amount}
-    result = _post("/api/dice", data)
+    validate_bet("dice", data)
+    result = _post(catalog.ENDPOINTS["dice"], data)
     _record_game("dice", data, result)
     return result
 
@@ -211,42 +555,34 @@ def play_dice(prediction: str, target: int, amount: float) -> dict:
 def play_blackjack(amount: float) -> dict:
     """Play blackjack."""
     data = {"bet": amount}
-    result = _post("/api/blackjack", data)
+    validate_bet("blackjack", data)
+    result = _post(catalog.ENDPOINTS["blackjack"], data)
     _record_game("blackjack", data, result)
     return result
 
 
-def list_games() -> dict:
-    """List available games from server, with fallback to local info."""
+_catalog: dict | None = None
+
+
+def cached_games() -> dict:
+    """The game catalog without touching the network (memory, disk cache of any age, or fallback)."""
+    if _catalog is not None:
+        return _catalog
+    return http_cache.peek("/api/games") or catalog.FALLBACK_CATALOG
+
+
+def list_games(refresh: bool = False) -> dict:
+    """List available games from server (cached on disk), with fallback to local info."""
+    global _catalog
+    if _catalog is not None and not refresh:
+        return _catalog
+    if refresh:
+        http_cache.invalidate("/api/games")
     try:
-        return _get("/api/games")
+        _catalog = http_cache.cached_get("/api/games")
+        return _catalog
     except Exception:
-        return {
-            "games": [
-                {
-                    "name": "Coinflip",
-                    "endpoint": "/api/coinflip",
-                    "bet_range": [0.01, 1.00],
-                    "house_edge": "2%",
-                    "payout": "1.96x",
-                    "description": "Pick heads or tails.",
-                },
-                {
-                    "name": "Dice",
-                    "endpoint": "/api/dice",
-                    "bet_range": [0.01, 1.00],
-                    "house_edge": "variable",
-                    "description": "Predict over/under a target with 2d6.",
-                },
-                {
-                    "name": "Blackjack",
-                    "endpoint": "/api/blackjack",
-                    "bet_range": [0.10, 5.00],
-                    "payout": "2x win, 2.5x natural",
-                    "description": "Standard single-hand blackjack.",
-                },
-            ]
-        }
+        return catalog.FALLBACK_CATALOG
 
 
 def get_game_by_id(game_id: str) -> dict | None:
@@ -257,31 +593,67 @@ def get_game_by_id(game_id: str) -> dict | None:
     return None
 
 
-def get_history(limit: int = 20) -> list[dict]:
-    """Return recent game history."""
+def find_game_index(history: list[dict], game_id: str) -> int | None:
+    for i in range(len(history) - 1, -1, -1):
+        if history[i].get("id") == game_id:
+            return i
+    return None
+
+
+def verify_history_entry(game_id: str) -> tuple[bool, str]:
+    """Check one game's integrity against the history hash chain."""
     history = _load_history()
-    return history[-limit:]
+    index = find_game_index(history, game_id)
+    if index is None:
+        return False, "not found in history"
+    return chain.verify_record(history, index, chain.load_state())
 
 
-def get_stats() -> dict:
-    """Compute stats from local history."""
+def verify_history(full: bool = False) -> dict:
+    """Check the whole history log against the hash chain and checkpoints."""
+    state = chain.load_state()
+    report = chain.verify_log(_load_history(), state, full=full)
+    if report["ok"]:
+        chain.save_state(state)
+    return report
+
+
+def get_history(limit: int | None = 20) -> list[dict]:
+    """Return recent game history (all of it if limit is None)."""
     history = _load_history()
-    if not history:
-        return {"games_played": 0, "total_wagered": 0, "total_pnl": 0, "win_rate": 0}
-
-    total = len(history)
-    wins = sum(1 for g in history if g.get("result", {}).get("won", False))
-    wagered = sum(g.get("request", {}).get("bet", 0) for g in history)
-    pnl = sum(
-        g.get("result", {}).get("payout", 0) - g.get("request", {}).get("bet", 0)
-        for g in history
-    )
-
-    return {
-        "games_played": total,
-        "wins": wins,
-        "losses": total - wins,
-        "win_rate": round(wins / total * 100, 1) if total else 0,
-        "total_wagered": round(wagered, 4),
-        "total_pnl": round(pnl, 4),
-    }
+    return history if limit is None else history[-limit:]
+
+
+def get_records(limit: int | None = 20) -> list[records.GameRecord]:
+    """Recent history as typed records (all of it if limit is None)."""
+    if not HISTORY_FILE.exists():
+        return []
+    return records.load_records(HISTORY_FILE.read_bytes(), limit)
+
+
+def get_stats(rebuild: bool = False, force: bool = False) -> dict:
+    """Return stats from the running aggregates.
+
+    With rebuild=True, recompute the aggregates from the raw history records
+    and persist them. History only keeps the newest 500 games, so a rebuild
+    that would count fewer games than the persisted aggregates raises
+    ValueError unless `force` is set.
+    """
+    with _locked_history():
+        agg = stats.load_aggregates()
+        if rebuild or agg is None:
+            history = get_records(None)
+            fresh = stats.rebuild(history, partial=_history_truncated(history))
+            if agg is not None and fresh["totals"]["games"] < agg["totals"]["games"] and not force:
+                raise ValueError(
+                    f"Rebuilding from history would count {fresh['totals']['games']} of "
+                    f"{agg['totals']['games']} recorded games (history keeps the newest {MAX_HISTORY}). "
+                    "Use --force to overwrite the stats anyway."
+                )
+            if agg is not None and fresh["totals"]["games"] < agg["totals"]["games"]:
+                fresh["partial"] = True
+            agg = fresh
+            stats.save_aggregates(agg)
+            # The rebuilt aggregates count exactly the retained games
+            stats.reset_counted([g.id for g in history if g.id])
+    return stats.summarize(agg)
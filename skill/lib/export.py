@@ -0,0 +1,267 @@
+"""Streaming history export to CSV, NDJSON, or a compact columnar binary file.
+
+Records are flattened, buffered in fixed-size chunks, and written chunk by
+chunk, so memory use is bounded by the chunk size rather than the history
+size. Incremental exports append only records after the last export cursor.
+"""
+
+import csv
+import json
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from lib.stats import is_win
+
+CURSOR_DIR = Path.home() / ".openclaw" / "clawsino"
+CURSOR_FILE = CURSOR_DIR / "export_cursor.json"
+
+FORMATS = ("csv", "ndjson", "bin")
+DEFAULT_CHUNK = 1000
+
+# Column name -> type code. Numeric codes are `array` typecodes; "s" is UTF-8 text.
+BASE_COLUMNS = [
+    ("id", "s"),
+    ("type", "s"),
+    ("timestamp", "d"),
+    ("bet", "d"),
+    ("payout", "d"),
+    ("won", "B"),
+    ("pick", "s"),     # coinflip choice or dice prediction
+    ("target", "b"),   # dice target, -1 otherwise
+    ("outcome", "s"),  # coin side, dice total, or blackjack outcome
+]
+PROOF_COLUMNS = [
+    ("proof_server_seed", "s"),
+    ("proof_server_seed_hash", "s"),
+    ("proof_client_seed", "s"),
+    ("proof_nonce", "s"),
+    ("proof_combined_hash", "s"),
+]
+
+# Binary layout: magic, u16 version, u16 column count, then per column
+# (u8 name length, name, u8 type code). Row groups follow, each a u32 row
+# count and one block per column. Text blocks are u32 offsets + blob.
+BIN_MAGIC = b"CLWSNCOL"
+BIN_VERSION = 1
+
+
+def columns_for(include_proofs: bool) -> list[tuple[str, str]]:
+    return BASE_COLUMNS + (PROOF_COLUMNS if include_proofs else [])
+
+
+def infer_format(path: str) -> str:
+    suffix = Path(path).suffix.lower().lstrip(".")
+    return {"jsonl": "ndjson", "clwc": "bin"}.get(suffix, suffix if suffix in FORMATS else "ndjson")
+
+
+def flatten(entry: dict, include_proofs: bool = False) -> dict:
+    """Flatten a history entry into a single-level export row."""
+    request = entry.get("request", {})
+    result = entry.get("result", {})
+    outcome = result.get("result", result.get("total", result.get("outcome", "")))
+    target = request.get("target")
+    row = {
+        "id": str(entry.get("id", "")),
+        "type": entry.get("type", ""),
+        "timestamp": float(entry.get("timestamp", 0)),
+        "bet": float(request.get("bet", 0) or 0),
+        "payout": float(result.get("payout", 0) or 0),
+        "won": int(is_win(result)),
+        "pick": request.get("choice") or request.get("prediction") or "",
+        "target": int(target) if target is not None else -1,
+        "outcome": str(outcome),
+    }
+    if include_proofs:
+        proof = result.get("fairness_proof") or {}
+        row["proof_server_seed"] = proof.get("serverSeed") or proof.get("server_seed") or ""
+        row["proof_server_seed_hash"] = proof.get("serverSeedHash") or proof.get("committed_hash") or ""
+        row["proof_client_seed"] = proof.get("clientSeed") or proof.get("client_seed") or ""
+        row["proof_nonce"] = proof.get("nonce", "")
+        row["proof_combined_hash"] = proof.get("combinedHash") or proof.get("combined_hash") or ""
+    return row
+
+
+def _chunks(entries, size: int, include_proofs: bool):
+    chunk = []
+    for entry in entries:
+        chunk.append(flatten(entry, include_proofs))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --- Writers ---
+
+def _write_csv(fh, chunk: list[dict], columns: list[tuple[str, str]], header: bool) -> None:
+    writer = csv.DictWriter(fh, fieldnames=[name for name, _ in columns])
+    if header:
+        writer.writeheader()
+    writer.writerows(chunk)
+
+
+def _write_ndjson(fh, chunk: list[dict]) -> None:
+    fh.write("".join(json.dumps(row, separators=(",", ":")) + "\n" for row in chunk))
+
+
+def _bin_header(columns: list[tuple[str, str]]) -> bytes:
+    parts = [BIN_MAGIC, struct.pack("<HH", BIN_VERSION, len(columns))]
+    for name, code in columns:
+        raw = name.encode()
+        parts.append(struct.pack("<B", len(raw)) + raw + code.encode())
+    return b"".join(parts)
+
+
+def _to_le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _write_bin(fh, chunk: list[dict], columns: list[tuple[str, str]]) -> None:
+    parts = [struct.pack("<I", len(chunk))]
+    for name, code in columns:
+        if code == "s":
+            blobs = [str(row[name]).encode() for row in chunk]
+            offsets = array("I", [0])
+            for blob in blobs:
+                offsets.append(offsets[-1] + len(blob))
+            parts.append(_to_le(offsets))
+            parts.append(b"".join(blobs))
+        else:
+            parts.append(_to_le(array(code, (row[name] for row in chunk))))
+    fh.write(b"".join(parts))
+
+
+def read_bin_header(fh) -> list[tuple[str, str]]:
+    if fh.read(len(BIN_MAGIC)) != BIN_MAGIC:
+        raise ValueError("Not a Clawsino columnar export file")
+    version, ncols = struct.unpack("<HH", fh.read(4))
+    if version != BIN_VERSION:
+        raise ValueError(f"Unsupported columnar export version {version}")
+    columns = []
+    for _ in range(ncols):
+        (length,) = struct.unpack("<B", fh.read(1))
+        name = fh.read(length).decode()
+        columns.append((name, fh.read(1).decode()))
+    return columns
+
+
+def _existing_columns(path: Path, fmt: str) -> list:
+    """Columns of an export being appended to: (name, type) pairs for bin, names otherwise."""
+    if fmt == "bin":
+        with open(path, "rb") as fh:
+            return read_bin_header(fh)
+    with open(path, newline="", encoding="utf-8") as fh:
+        first = fh.readline()
+    if fmt == "csv":
+        return next(csv.reader([first]), [])
+    try:
+        row = json.loads(first)
+    except ValueError:
+        return []
+    return list(row) if isinstance(row, dict) else []
+
+
+def iter_bin(path: str | Path):
+    """Yield each row group of a columnar export as {column: values}."""
+    with open(path, "rb") as fh:
+        columns = read_bin_header(fh)
+        while raw := fh.read(4):
+            (nrows,) = struct.unpack("<I", raw)
+            group = {}
+            for name, code in columns:
+                if code == "s":
+                    offsets = array("I")
+                    offsets.frombytes(fh.read(4 * (nrows + 1)))
+                    if sys.byteorder == "big":
+                        offsets.byteswap()
+                    blob = fh.read(offsets[-1])
+                    group[name] = [blob[offsets[i]:offsets[i + 1]].decode() for i in range(nrows)]
+                else:
+                    values = array(code)
+                    values.frombytes(fh.read(values.itemsize * nrows))
+                    if sys.byteorder == "big":
+                        values.byteswap()
+                    group[name] = values
+            yield group
+
+
+# --- Cursor ---
+
+def _load_cursors() -> dict:
+    if CURSOR_FILE.exists():
+        return json.loads(CURSOR_FILE.read_text())
+    return {}
+
+
+def _save_cursor(path: Path, entry: dict) -> None:
+    cursors = _load_cursors()
+    cursors[str(path)] = {"id": entry.get("id"), "timestamp": entry.get("timestamp", 0)}
+    CURSOR_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CURSOR_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(cursors, indent=2))
+    tmp.replace(CURSOR_FILE)
+
+
+def _after_cursor(history: list[dict], cursor: dict | None) -> list[dict]:
+    """Entries recorded after the cursor entry (by id, else by timestamp)."""
+    if not cursor:
+        return history
+    for i in range(len(history) - 1, -1, -1):
+        if history[i].get("id") == cursor.get("id"):
+            return history[i + 1:]
+    # Cursor entry was trimmed from history — fall back to its timestamp
+    return [g for g in history if g.get("timestamp", 0) > cursor.get("timestamp", 0)]
+
+
+# --- Export ---
+
+def export_history(
+    history: list[dict],
+    path: str | Path,
+    fmt: str | None = None,
+    include_proofs: bool = False,
+    incremental: bool = False,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> int:
+    """Stream history to `path`. Returns the number of records written."""
+    path = Path(path).expanduser().resolve()
+    fmt = fmt or infer_format(str(path))
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    columns = columns_for(include_proofs)
+
+    appending = incremental and path.exists() and path.stat().st_size > 0
+    entries = _after_cursor(history, _load_cursors().get(str(path))) if appending else history
+
+    if appending:
+        expected = columns if fmt == "bin" else [name for name, _ in columns]
+        if _existing_columns(path, fmt) != expected:
+            raise ValueError("Existing export has different columns — rerun without --incremental")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    binary = fmt == "bin"
+    mode = ("ab" if binary else "a") if appending else ("wb" if binary else "w")
+    written = 0
+    with open(path, mode, **({} if binary else {"newline": "", "encoding": "utf-8"})) as fh:
+        if binary and not appending:
+            fh.write(_bin_header(columns))
+        for chunk in _chunks(entries, chunk_size, include_proofs):
+            if fmt == "csv":
+                _write_csv(fh, chunk, columns, header=not appending and written == 0)
+            elif fmt == "ndjson":
+                _write_ndjson(fh, chunk)
+            else:
+                _write_bin(fh, chunk, columns)
+            written += len(chunk)
+        if fmt == "csv" and not appending and written == 0:
+            _write_csv(fh, [], columns, header=True)
+
+    if entries:
+        _save_cursor(path, entries[-1])
+    return written
@@ -0,0 +1,149 @@
+"""Persistent conditional-GET cache for rarely changing server endpoints.
+
+The game catalog and contract addresses only change on redeploy, so they are
+cached on disk with a TTL. Stale entries are served immediately while a
+background request revalidates them with ETag / If-Modified-Since, and the
+cache is dropped whenever a 402 reports contract addresses that disagree
+with the cached ones.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from lib.wallet import get_server_url
+
+CACHE_DIR = Path.home() / ".openclaw" / "clawsino"
+CACHE_FILE = CACHE_DIR / "http_cache.json"
+
+# endpoint -> (ttl, stale-while-revalidate window), in seconds
+POLICIES = {
+    "/api/games": (3600, 7 * 86400),
+    "/api/contracts": (3600, 7 * 86400),
+}
+DEFAULT_POLICY = (60, 0)
+# Background revalidation must never hold up a CLI run's exit
+REVALIDATE_TIMEOUT = 2.0
+
+_lock = threading.Lock()
+
+
+def _load() -> dict:
+    if CACHE_FILE.exists():
+        try:
+            return json.loads(CACHE_FILE.read_text())
+        except ValueError:
+            return {}
+    return {}
+
+
+def _save(cache: dict) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_FILE.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(cache, indent=2))
+    tmp.replace(CACHE_FILE)
+
+
+def _update(url: str, entry: dict | None) -> None:
+    with _lock:
+        cache = _load()
+        if entry is None:
+            cache.pop(url, None)
+        else:
+            cache[url] = entry
+        _save(cache)
+
+
+def _fetch(url: str, entry: dict | None, timeout: float) -> dict:
+    """GET `url`, revalidating `entry` if given. Returns the new cache entry."""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = requests.get(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304 and entry:
+        fresh = {**entry, "fetched_at": time.time()}
+    else:
+        resp.raise_for_status()
+        fresh = {
+            "body": resp.json(),
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+    _update(url, fresh)
+    return fresh
+
+
+def _revalidate_in_background(url: str, entry: dict, timeout: float) -> None:
+    def run():
+        try:
+            _fetch(url, entry, min(timeout, REVALIDATE_TIMEOUT))
+        except Exception:
+            pass  # Keep serving the stale entry
+
+    # Daemon: an unanswered refresh is abandoned at exit (writes are atomic)
+    threading.Thread(target=run, name="clawsino-revalidate", daemon=True).start()
+
+
+def cached_get(endpoint: str, timeout: float = 30) -> dict:
+    """GET a JSON endpoint through the on-disk cache."""
+    url = f"{get_server_url()}{endpoint}"
+    ttl, stale_window = POLICIES.get(endpoint, DEFAULT_POLICY)
+    entry = _load().get(url)
+
+    if entry:
+        age = time.time() - entry.get("fetched_at", 0)
+        if age < ttl:
+            return entry["body"]
+        if age < ttl + stale_window:
+            _revalidate_in_background(url, entry, timeout)
+            return entry["body"]
+
+    try:
+        return _fetch(url, entry, timeout)["body"]
+    except Exception:
+        if entry:
+            return entry["body"]
+        raise
+
+
+def peek(endpoint: str) -> dict | None:
+    """The cached body for an endpoint whatever its age, or None. Never touches the network."""
+    entry = _load().get(f"{get_server_url()}{endpoint}")
+    return entry["body"] if entry else None
+
+
+def invalidate(endpoint: str | None = None) -> None:
+    """Drop one cached endpoint, or everything cached for the current server."""
+    server = get_server_url()
+    with _lock:
+        cache = _load()
+        if endpoint:
+            cache.pop(f"{server}{endpoint}", None)
+        else:
+            cache = {url: e for url, e in cache.items() if not url.startswith(f"{server}/")}
+        _save(cache)
+
+
+def check_payment_addresses(extra: dict) -> bool:
+    """Invalidate the cache if a 402's contract addresses differ from the cached ones.
+
+    Returns True if the cache was invalidated.
+    """
+    entry = _load().get(f"{get_server_url()}/api/contracts")
+    if not entry or not isinstance(entry.get("body"), dict):
+        return False
+    cached = entry["body"]
+    for key, cached_key in (("usdcAddress", "usdc"), ("payoutAddress", "payout")):
+        seen = extra.get(key)
+        if seen and (cached.get(cached_key) or "").lower() != seen.lower():
+            invalidate()
+            return True
+    return False
@@ -0,0 +1,401 @@
+"""Durable local outbox — enqueue bets now, play them from a background worker.
+
+Bets are appended to an append-only JSONL journal (outbox.jsonl) and
+`enqueue()` returns as soon as the line is written, so callers never wait on
+the server. A single worker process (guarded by an flock on outbox.lock)
+replays the journal, drains queued bets at a configurable rate with bounded
+concurrency, and records results in history.
+
+Each bet's key doubles as its payment Idempotency-Key, and every step is
+journaled: enqueue → paying → paid (with the X-PAYMENT proof) → done | failed.
+After a crash a `paid` bet is resubmitted with its saved proof (or marked
+done if history already has it), and a bet interrupted mid-payment is failed
+rather than paid again — so each bet pays at most once and is recorded once.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Windows — no cross-process locking
+    fcntl = None
+
+from lib import catalog, client, stranded
+from lib.stats import is_win
+
+OUTBOX_DIR = Path.home() / ".openclaw" / "clawsino"
+JOURNAL_FILE = OUTBOX_DIR / "outbox.jsonl"
+JOURNAL_LOCK = OUTBOX_DIR / "outbox.jsonl.lock"
+WORKER_LOCK = OUTBOX_DIR / "outbox.lock"
+WORKER_LOG = OUTBOX_DIR / "outbox.log"
+
+DEFAULT_CONCURRENCY = 4
+POLL_INTERVAL = 0.05
+MAX_AGE = 3600.0  # queued bets older than this are failed, not played
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+KEEP_FINISHED = 3600.0  # finished bets stay in the journal this long for `outbox status`
+TERMINAL = ("done", "failed")
+ACTIVE = ("enqueued", "paid")  # states the worker still has to act on
+
+_append_lock = threading.Lock()
+_lock_fd: int | None = None
+_journal_fd: int | None = None
+_journal_ino: int | None = None
+
+
+# --- Journal ---
+
+def _flock(fd: int, op: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, op)
+
+
+def _append(event: str, key: str, **fields) -> None:
+    """Append one event line. Safe across threads and processes."""
+    global _lock_fd, _journal_fd, _journal_ino
+    line = json.dumps({"event": event, "key": key, "ts": time.time(), **fields}, separators=(",", ":"))
+    data = (line + "\n").encode()
+    with _append_lock:
+        if _lock_fd is None:
+            _lock_fd = os.open(JOURNAL_LOCK, os.O_RDWR | os.O_CREAT, 0o600)
+        # Shared lock: appends run concurrently, compaction waits for them
+        _flock(_lock_fd, fcntl.LOCK_SH if fcntl else 0)
+        try:
+            # Reopen if the worker compacted (replaced) the journal since we opened it
+            ino = os.stat(JOURNAL_FILE).st_ino if JOURNAL_FILE.exists() else None
+            if _journal_fd is None or ino != _journal_ino:
+                if _journal_fd is not None:
+                    os.close(_journal_fd)
+                _journal_fd = os.open(JOURNAL_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                _journal_ino = os.fstat(_journal_fd).st_ino
+            os.write(_journal_fd, data)
+        finally:
+            _flock(_lock_fd, fcntl.LOCK_UN if fcntl else 0)
+
+
+def _apply(items: dict, ev: dict) -> None:
+    key = ev["key"]
+    if ev["event"] == "enqueue":
+        items[key] = {
+            "key": key, "type": ev["type"], "request": ev["request"], "state": "enqueued",
+            "enqueued_at": ev["ts"], "updated_at": ev["ts"], "attempts": 0,
+        }
+        return
+    item = items.get(key)
+    if item is None:
+        return
+    item["updated_at"] = ev["ts"]
+    if ev["event"] == "paying":
+        item["state"] = "paying"
+        item["attempts"] += 1
+    elif ev["event"] == "paid":
+        item.update(state="paid", headers=ev["headers"], tx_hash=ev.get("tx_hash"),
+                    replay_safe=ev.get("replay_safe", False))
+    elif ev["event"] == "unpaid":
+        # Attempt failed before any money moved; try again later
+        item.update(state="enqueued", retry_at=ev["retry_at"], error=ev.get("error"))
+    elif ev["event"] == "done":
+        item.update(state="done", game_id=ev.get("game_id"), won=ev.get("won"), payout=ev.get("payout"))
+    elif ev["event"] == "failed":
+        item.update(state="failed", error=ev.get("error"))
+
+
+def _read(items: dict, offset: int, changed: set | None = None) -> int:
+    """Apply journal events from byte `offset`; returns the new offset (complete lines only).
+
+    Keys of the bets touched are added to `changed` if given.
+    """
+    if not JOURNAL_FILE.exists():
+        return 0
+    with open(JOURNAL_FILE, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    for line in data[:end].splitlines():
+        if line.strip():
+            ev = json.loads(line)
+            _apply(items, ev)
+            if changed is not None:
+                changed.add(ev["key"])
+    return offset + end
+
+
+def _inode() -> int | None:
+    try:
+        return os.stat(JOURNAL_FILE).st_ino
+    except FileNotFoundError:
+        return None
+
+
+def load() -> dict:
+    """Current state of every bet in the journal, keyed by bet key."""
+    items: dict = {}
+    _read(items, 0)
+    return items
+
+
+def compact(keep_finished: float = KEEP_FINISHED) -> tuple[int, int]:
+    """Rewrite the journal without bets that finished more than `keep_finished` seconds ago.
+
+    Returns (bets removed, bets kept).
+    """
+    if not JOURNAL_FILE.exists():
+        return 0, 0
+    lock_fd = os.open(JOURNAL_LOCK, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        _flock(lock_fd, fcntl.LOCK_EX if fcntl else 0)
+        items = load()
+        cutoff = time.time() - keep_finished
+        drop = {k for k, i in items.items() if i["state"] in TERMINAL and i["updated_at"] < cutoff}
+        if not drop:
+            return 0, len(items)
+        lines = [line for line in JOURNAL_FILE.read_bytes().splitlines(keepends=True)
+                 if line.strip() and json.loads(line)["key"] not in drop]
+        tmp = JOURNAL_FILE.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(b"".join(lines))
+        tmp.replace(JOURNAL_FILE)
+        return len(drop), len(items) - len(drop)
+    finally:
+        _flock(lock_fd, fcntl.LOCK_UN if fcntl else 0)
+        os.close(lock_fd)
+
+
+# --- Producer side ---
+
+def enqueue(game_type: str, data: dict, validate: bool = True) -> str:
+    """Queue a bet for the worker and return its key (also its Idempotency-Key).
+
+    Validation uses the cached (or fallback) catalog only, so enqueueing never
+    waits on the server.
+    """
+    if game_type not in catalog.ENDPOINTS:
+        raise ValueError(f"Unknown game '{game_type}'")
+    if validate:
+        client.validate_bet(game_type, data, offline=True)
+    OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+    key = uuid.uuid4().hex
+    _append("enqueue", key, type=game_type, request=data)
+    return key
+
+
+def worker_running() -> bool:
+    if fcntl is None or not WORKER_LOCK.exists():
+        return False
+    fd = os.open(WORKER_LOCK, os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return True
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return False
+    finally:
+        os.close(fd)
+
+
+def spawn_worker(rate: float | None = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 idle_exit: float = 30.0) -> bool:
+    """Start a detached worker unless one is already running. Returns True if started."""
+    if worker_running():
+        return False
+    script = Path(__file__).resolve().parent.parent / "scripts" / "clawsino.py"
+    cmd = [sys.executable, str(script), "outbox", "worker",
+           "--concurrency", str(concurrency), "--idle-exit", str(idle_exit)]
+    if rate:
+        cmd += ["--rate", str(rate)]
+    OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+    with open(WORKER_LOG, "ab") as log:
+        subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                         start_new_session=True, close_fds=True)
+    return True
+
+
+# --- Worker ---
+
+def _in_history(key: str) -> dict | None:
+    for entry in reversed(client._load_history()):
+        if entry.get("outbox_key") == key:
+            return entry
+    return None
+
+
+def _finish(item: dict, result: dict) -> dict:
+    if result.get("error"):
+        _append("failed", item["key"], error=result.get("message", result["error"]))
+        return {"key": item["key"], "ok": False, "error": result.get("message", result["error"])}
+    client._record_game(item["type"], item["request"], result, outbox_key=item["key"])
+    won = is_win(result)
+    _append("done", item["key"], game_id=result.get("game_id"), won=won, payout=result.get("payout"))
+    return {"key": item["key"], "ok": True, "game_id": result.get("game_id"), "won": won,
+            "payout": result.get("payout"), "bet": item["request"].get("bet")}
+
+
+def _retry(item: dict, error: Exception) -> dict:
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** item["attempts"])
+    _append("unpaid", item["key"], retry_at=time.time() + delay, error=str(error))
+    return {"key": item["key"], "ok": False, "retry_in": delay, "error": str(error)}
+
+
+def _process(item: dict, max_age: float) -> dict:
+    """Play one queued (or paid-but-unfinished) bet. Never raises."""
+    key = item["key"]
+    endpoint = catalog.ENDPOINTS[item["type"]]
+    data = item["request"]
+    try:
+        if item["state"] == "enqueued":
+            if time.time() - item["enqueued_at"] > max_age:
+                _append("failed", key, error="expired before it could be played")
+                return {"key": key, "ok": False, "error": "expired"}
+            _append("paying", key)
+            try:
+                payment = client.prepare_payment(endpoint, data, idempotency_key=key)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                return _retry({**item, "attempts": item["attempts"] + 1}, e)
+            if "result" in payment:
+                return _finish(item, payment["result"])
+            _append("paid", key, headers=payment["headers"], tx_hash=payment.get("tx_hash"),
+                    replay_safe=payment["replay_safe"])
+        else:
+            payment = {"headers": item["headers"], "tx_hash": item.get("tx_hash"), "idempotency_key": key,
+                       "replay_safe": item.get("replay_safe", False)}
+
+        try:
+            result = client.submit_payment(endpoint, data, payment)
+        except client.StrandedPaymentError as e:
+            # Already in the stranded ledger; `clawsino reconcile` resubmits it
+            _append("failed", key, error=str(e))
+            return {"key": key, "ok": False, "error": str(e)}
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            # Only dev payments get here (onchain ones strand) — nothing was spent
+            return _retry({**item, "attempts": item["attempts"] + 1}, e)
+        return _finish(item, result)
+    except Exception as e:
+        _append("failed", key, error=str(e))
+        return {"key": key, "ok": False, "error": str(e)}
+
+
+def _recover(items: dict) -> None:
+    """Settle bets a previous worker left mid-flight."""
+    for key, item in items.items():
+        if item["state"] == "paying":
+            # The transfer may or may not have happened — never pay twice
+            _append("failed", key, error="worker stopped during payment; not retried to avoid paying twice "
+                                         "(check your wallet and 'clawsino sync')")
+        elif item["state"] == "paid":
+            entry = _in_history(key)
+            if entry:
+                result = entry.get("result", {})
+                _append("done", key, game_id=entry.get("id"), payout=result.get("payout"),
+                        won=is_win(result))
+            elif item.get("tx_hash") and not item.get("replay_safe"):
+                # The submit may have reached a server that does not dedupe — resending could play twice
+                payment = {"headers": item["headers"], "tx_hash": item["tx_hash"], "idempotency_key": key}
+                stranded.record(item["type"], catalog.ENDPOINTS[item["type"]], item["request"], payment,
+                                "worker stopped during submit")
+                _append("failed", key, error="worker stopped during submit; not resent to avoid playing twice "
+                                             "(see 'clawsino reconcile --list')")
+
+
+def _acquire_worker_lock() -> int | None:
+    OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(WORKER_LOCK, os.O_RDWR | os.O_CREAT, 0o600)
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+    os.ftruncate(fd, 0)
+    os.write(fd, str(os.getpid()).encode())
+    return fd
+
+
+def run_worker(
+    rate: float | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    idle_exit: float | None = None,
+    max_age: float = MAX_AGE,
+    on_result=None,
+) -> dict:
+    """Drain the outbox until interrupted, or until idle for `idle_exit` seconds.
+
+    At most `concurrency` bets are in flight and at most `rate` bets/s are
+    started. `on_result(outcome)` is called as each bet finishes. Returns
+    {"started": False} if another worker holds the lock.
+    """
+    lock_fd = _acquire_worker_lock()
+    if lock_fd is None:
+        return {"started": False}
+
+    compact()
+    items: dict = {}
+    journal = _inode()
+    offset = _read(items, 0)
+    _recover(items)
+    active = {k for k, i in items.items() if i["state"] in ACTIVE}
+    read_lock = os.open(JOURNAL_LOCK, os.O_RDWR | os.O_CREAT, 0o600)
+    interval = 1 / rate if rate else 0
+    next_at = time.monotonic()
+    idle_since = time.monotonic()
+    in_flight: dict = {}
+    summary = {"started": True, "played": 0, "failed": 0, "retried": 0}
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="clawsino-outbox") as pool:
+            while True:
+                # Reap before reading, so a finished bet's events are visible before it can be rescheduled
+                for key, future in list(in_flight.items()):
+                    if future.done():
+                        del in_flight[key]
+                        outcome = future.result()
+                        summary["played" if outcome["ok"] else "retried" if "retry_in" in outcome else "failed"] += 1
+                        if on_result:
+                            on_result(outcome)
+                changed: set = set()
+                _flock(read_lock, fcntl.LOCK_SH if fcntl else 0)
+                try:
+                    if _inode() != journal:
+                        # Compacted by `clawsino outbox compact` — offsets are stale, replay from the start
+                        items, offset, journal, active = {}, 0, _inode(), set()
+                    offset = _read(items, offset, changed)
+                finally:
+                    _flock(read_lock, fcntl.LOCK_UN if fcntl else 0)
+                for key in changed:
+                    if items.get(key, {}).get("state") in ACTIVE:
+                        active.add(key)
+                    else:
+                        active.discard(key)
+
+                now = time.time()
+                ready = sorted(
+                    (items[k] for k in active if k not in in_flight and items[k].get("retry_at", 0) <= now),
+                    key=lambda i: i["enqueued_at"],
+                )
+                for item in ready:
+                    if len(in_flight) >= concurrency or time.monotonic() < next_at:
+                        break
+                    in_flight[item["key"]] = pool.submit(_process, dict(item), max_age)
+                    next_at = max(next_at, time.monotonic()) + interval
+
+                if in_flight or active:
+                    idle_since = time.monotonic()
+                elif idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                    break
+                time.sleep(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(read_lock)
+        os.close(lock_fd)  # releases the worker flock
+    return summary
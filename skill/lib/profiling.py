@@ -0,0 +1,167 @@
+"""CPU and allocation profiling for one CLI run (`--profile` or CLAWSINO_PROFILE).
+
+Profiling starts before the rest of `lib` is imported, so web3/eth_account
+import cost shows up alongside history parsing, key loading and rendering.
+Each run writes two files to ~/.openclaw/clawsino/profiles (or the directory
+CLAWSINO_PROFILE names):
+
+Worker threads (autoplay's submit pool, the outbox worker) get a profiler of
+their own via threading.setprofile, merged into the main one at the end, so
+lib.client / lib.wallet time spent off the main thread is reported too.
+
+- <stamp>-<command>.pstats — raw cProfile data (`python -m pstats`, snakeviz)
+- <stamp>-<command>.txt    — wall/CPU time, peak memory, the top functions
+  overall, the top functions in lib.client / lib.wallet / lib.fairness, and
+  the biggest allocation sites.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+PROFILE_DIR = Path.home() / ".openclaw" / "clawsino" / "profiles"
+HIGHLIGHT_MODULES = {
+    "lib.client": os.path.join("lib", "client.py"),
+    "lib.wallet": os.path.join("lib", "wallet.py"),
+    "lib.fairness": os.path.join("lib", "fairness.py"),
+}
+TOP = 25
+TRACE_FRAMES = 10
+
+
+def requested(argv: list[str]) -> bool:
+    value = os.environ.get("CLAWSINO_PROFILE", "")
+    return "--profile" in argv or value.lower() not in ("", "0", "false", "no")
+
+
+def output_dir() -> Path:
+    value = os.environ.get("CLAWSINO_PROFILE", "")
+    if os.sep in value or value.startswith("~"):
+        return Path(value).expanduser()
+    return PROFILE_DIR
+
+
+class _Snapshot:
+    """pstats source for a profiler still enabled in another thread.
+
+    Profile.disable() only acts on the calling thread, so a worker's profiler
+    is read in place rather than stopped from the main thread.
+    """
+
+    def __init__(self, profiler: cProfile.Profile):
+        self.profiler = profiler
+
+    def create_stats(self) -> None:
+        self.profiler.snapshot_stats()
+        self.stats = self.profiler.stats
+
+
+def start() -> dict:
+    """Start the CPU profiler and allocation tracing; returns the session for finish()."""
+    tracemalloc.start(TRACE_FRAMES)
+    profiler = cProfile.Profile()
+    session = {
+        "profiler": profiler,
+        "threads": [],
+        "wall": time.perf_counter(),
+        "cpu": time.process_time(),
+    }
+    lock = threading.Lock()
+
+    def profile_thread(frame, event, arg):
+        # First event in a new thread: swap this hook for a profiler of its own
+        thread_profiler = cProfile.Profile()
+        try:
+            thread_profiler.enable()
+        except ValueError:
+            # 3.12+: cProfile sits on sys.monitoring, which allows one profiler per
+            # process — and the main one already sees every thread
+            sys.setprofile(None)
+            return
+        with lock:
+            session["threads"].append(thread_profiler)
+
+    threading.setprofile(profile_thread)
+    profiler.enable()
+    return session
+
+
+def _collect(session: dict) -> pstats.Stats:
+    """Main-thread stats with every worker thread's merged in."""
+    stats = pstats.Stats(session["profiler"], stream=io.StringIO())
+    for thread_profiler in session["threads"]:
+        stats.add(_Snapshot(thread_profiler))
+    return stats
+
+
+def _function_rows(stats: pstats.Stats, keys: list) -> list[str]:
+    rows = []
+    for key in keys:
+        filename, line, name = key
+        _, calls, self_time, cum_time, _ = stats.stats[key]
+        rows.append(f"  {cum_time * 1000:10.2f} ms cum  {self_time * 1000:9.2f} ms self  {calls:8d} calls  "
+                    f"{_short(filename)}:{line}({name})")
+    return rows
+
+
+def _short(filename: str) -> str:
+    parts = Path(filename).parts
+    return os.path.join(*parts[-2:]) if len(parts) >= 2 else filename
+
+
+def report(session: dict, command: str, stats: pstats.Stats, snapshot: tracemalloc.Snapshot, peak: int) -> str:
+    wall = time.perf_counter() - session["wall"]
+    cpu = time.process_time() - session["cpu"]
+    by_cum = sorted(stats.stats, key=lambda k: stats.stats[k][3], reverse=True)
+
+    lines = [
+        f"clawsino {command} — profiled {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"  wall {wall * 1000:.1f} ms   cpu {cpu * 1000:.1f} ms   peak traced memory {peak / 1e6:.2f} MB"
+        f"   threads profiled {1 + len(session['threads'])}",
+        "",
+        f"Top {TOP} functions by cumulative time:",
+        *_function_rows(stats, by_cum[:TOP]),
+    ]
+    for module, path in HIGHLIGHT_MODULES.items():
+        keys = [k for k in by_cum if k[0].endswith(path)][:10]
+        lines += ["", f"{module}:"]
+        lines += _function_rows(stats, keys) if keys else ["  (not called)"]
+
+    lines += ["", f"Top {TOP} allocation sites (live at exit):"]
+    for stat in snapshot.statistics("lineno")[:TOP]:
+        frame = stat.traceback[0]
+        lines.append(f"  {stat.size / 1024:10.1f} KiB  {stat.count:8d} blocks  {_short(frame.filename)}:{frame.lineno}")
+    lines += ["", "Allocations by file:"]
+    for stat in snapshot.statistics("filename")[:10]:
+        lines.append(f"  {stat.size / 1024:10.1f} KiB  {_short(stat.traceback[0].filename)}")
+    return "\n".join(lines) + "\n"
+
+
+def finish(session: dict, command: str) -> Path:
+    """Stop profiling and write the .pstats and .txt reports. Returns the .txt path."""
+    threading.setprofile(None)
+    session["profiler"].disable()
+    stats = _collect(session)
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    out = output_dir()
+    out.mkdir(parents=True, exist_ok=True)
+    stem = out / f"{time.strftime('%Y%m%d-%H%M%S')}-{command or 'help'}-{os.getpid()}"
+    stats.dump_stats(str(stem.with_suffix(".pstats")))
+    text = report(session, command, stats, snapshot, peak)
+    stem.with_suffix(".txt").write_text(text)
+
+    # Summary on stderr so --json output stays clean
+    print("\n" + "\n".join(text.splitlines()[:2]), file=sys.stderr)
+    print(f"⏱️  Profile written to {stem.with_suffix('.txt')} (+ .pstats)", file=sys.stderr)
+    return stem.with_suffix(".txt")
@@ -0,0 +1,292 @@
+"""Typed, compact game records with fast JSON decoding.
+
+History is stored as plain JSON. These classes hold a decoded entry in
+`__slots__` fields instead of nested dicts; the bulky parts — the game
+result, its fairness proof and blackjack hands — stay as decoded JSON until
+first accessed.
+Unknown keys are kept aside, so `to_dict()` gives back an equal dict and
+existing files (and their chain hashes) round-trip unchanged.
+
+JSON is decoded with orjson when it is installed (`pip install
+clawsino[fast]`), otherwise with the standard library.
+"""
+
+import gc
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+from lib import fairness
+
+
+def loads(data: bytes | str):
+    """Decode JSON, using orjson if available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _encode(value):
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, tuple) and value and isinstance(value[0], _Record):
+        return [v.to_dict() for v in value]
+    return value
+
+
+class _Record:
+    """Base for slot-backed JSON objects.
+
+    Subclasses list `_fields` as (json key, slot) pairs; a bitmask remembers
+    which keys were present so absent keys stay absent on the way back out.
+    """
+
+    __slots__ = ("_present", "_extra")
+    _fields: tuple[tuple[str, str], ...] = ()
+    _index: dict[str, tuple[int, str, object]] = {}
+    _attrs: frozenset[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # json key -> (presence bit, slot name, slot setter); the bound setter skips setattr's lookup
+        cls._index = {key: (1 << i, attr, getattr(cls, attr).__set__) for i, (key, attr) in enumerate(cls._fields)}
+        cls._attrs = frozenset(attr for _, attr in cls._fields)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        self = cls.__new__(cls)
+        index = cls._index
+        present = 0
+        extra = None
+        for key, value in data.items():
+            slot = index.get(key)
+            if slot is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            else:
+                present |= slot[0]
+                slot[2](self, value)
+        self._present = present
+        self._extra = extra
+        return self
+
+    def __getattr__(self, name: str):
+        # Only reached for unset slots, i.e. keys absent from the JSON
+        if name in self._attrs:
+            return None
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def to_dict(self) -> dict:
+        out = {}
+        for key, (bit, attr, _) in self._index.items():
+            if self._present & bit:
+                out[key] = _encode(getattr(self, attr))
+        if self._extra:
+            out.update(self._extra)
+        return out
+
+    def get(self, key: str, default=None):
+        """Dict-style access by JSON key, for code that still handles raw results."""
+        slot = self._index.get(key)
+        if slot is not None:
+            return _encode(getattr(self, slot[1])) if self._present & slot[0] else default
+        return (self._extra or {}).get(key, default)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class FairnessProof(_Record):
+    __slots__ = ("server_seed", "server_seed_hash", "client_seed", "nonce", "combined_hash", "hash_algo")
+    _fields = (
+        ("serverSeed", "server_seed"),
+        ("serverSeedHash", "server_seed_hash"),
+        ("clientSeed", "client_seed"),
+        ("nonce", "nonce"),
+        ("combinedHash", "combined_hash"),
+        ("hash_algo", "hash_algo"),
+    )
+
+    def verify(self) -> bool:
+        return fairness.verify_game_proof(self.to_dict())
+
+
+class Card(_Record):
+    __slots__ = ("rank", "suit", "value")
+    _fields = (("rank", "rank"), ("suit", "suit"), ("value", "value"))
+
+    def __str__(self) -> str:
+        return f"{self.rank or '?'}{self.suit or ''}"
+
+
+class GameResult(_Record):
+    """Fields every game response (or recorded error) may carry."""
+
+    __slots__ = ("game_id", "game", "bet", "payout", "multiplier", "won", "_proof",
+                 "payout_tx_hash", "bet_tx_hash", "error", "message")
+    _fields = (
+        ("game_id", "game_id"),
+        ("game", "game"),
+        ("bet", "bet"),
+        ("payout", "payout"),
+        ("multiplier", "multiplier"),
+        ("won", "won"),
+        ("fairness_proof", "_proof"),
+        ("payoutTxHash", "payout_tx_hash"),
+        ("betTxHash", "bet_tx_hash"),
+        ("error", "error"),
+        ("message", "message"),
+    )
+
+    @property
+    def fairness_proof(self) -> FairnessProof | None:
+        """Parsed on first access."""
+        if isinstance(self._proof, dict):
+            self._proof = FairnessProof.from_dict(self._proof)
+        return self._proof
+
+    @property
+    def is_win(self) -> bool:
+        return bool(self.won)
+
+
+class CoinflipResult(GameResult):
+    __slots__ = ("result", "choice")
+    _fields = GameResult._fields + (("result", "result"), ("choice", "choice"))
+
+
+class DiceResult(GameResult):
+    __slots__ = ("roll", "total", "prediction", "target")
+    _fields = GameResult._fields + (
+        ("roll", "roll"),
+        ("total", "total"),
+        ("prediction", "prediction"),
+        ("target", "target"),
+    )
+
+
+class BlackjackResult(GameResult):
+    __slots__ = ("_player_hand", "_dealer_hand", "player_total", "dealer_total", "outcome")
+    _fields = GameResult._fields + (
+        ("playerHand", "_player_hand"),
+        ("dealerHand", "_dealer_hand"),
+        ("playerTotal", "player_total"),
+        ("dealerTotal", "dealer_total"),
+        ("outcome", "outcome"),
+    )
+
+    @staticmethod
+    def _hand(cards) -> tuple:
+        if isinstance(cards, list):
+            return tuple(Card.from_dict(c) if isinstance(c, dict) else c for c in cards)
+        return cards or ()
+
+    @property
+    def player_hand(self) -> tuple[Card, ...]:
+        """Parsed on first access."""
+        if isinstance(self._player_hand, list):
+            self._player_hand = self._hand(self._player_hand)
+        return self._player_hand or ()
+
+    @property
+    def dealer_hand(self) -> tuple[Card, ...]:
+        """Parsed on first access."""
+        if isinstance(self._dealer_hand, list):
+            self._dealer_hand = self._hand(self._dealer_hand)
+        return self._dealer_hand or ()
+
+    @property
+    def is_win(self) -> bool:
+        # Blackjack responses report `outcome`, not `won`
+        if self.won is not None:
+            return bool(self.won)
+        return self.outcome in ("win", "blackjack")
+
+
+RESULT_TYPES = {
+    "coinflip": CoinflipResult,
+    "dice": DiceResult,
+    "blackjack": BlackjackResult,
+}
+
+
+def result_from_dict(data: dict, game_type: str | None = None) -> GameResult:
+    """Typed result for a game response, picked by its `game` field (or `game_type`)."""
+    cls = RESULT_TYPES.get(data.get("game") or game_type, GameResult)
+    if cls is GameResult and "playerHand" in data:
+        cls = BlackjackResult
+    return cls.from_dict(data)
+
+
+class GameRecord(_Record):
+    """One history entry: the request sent, the typed result, and chain fields."""
+
+    __slots__ = ("id", "type", "timestamp", "request", "_result", "source", "seq", "prev_hash", "hash")
+    _fields = (
+        ("id", "id"),
+        ("type", "type"),
+        ("timestamp", "timestamp"),
+        ("request", "request"),
+        ("result", "_result"),
+        ("source", "source"),
+        ("seq", "seq"),
+        ("prev_hash", "prev_hash"),
+        ("hash", "hash"),
+    )
+
+    @property
+    def result(self) -> GameResult:
+        """Parsed on first access."""
+        if isinstance(self._result, dict):
+            self._result = result_from_dict(self._result, self.type)
+        return self._result if self._result is not None else GameResult.from_dict({})
+
+    # The summary fields below read the raw result dict directly when it
+    # hasn't been parsed yet, so listing history or folding stats never
+    # builds result objects.
+
+    @property
+    def bet(self) -> float:
+        return (self.request or {}).get("bet", 0) or 0
+
+    @property
+    def payout(self) -> float:
+        result = self._result
+        if isinstance(result, dict):
+            return result.get("payout", 0) or 0
+        return (result.payout or 0) if result is not None else 0
+
+    @property
+    def pnl(self) -> float:
+        return self.payout - self.bet
+
+    @property
+    def won(self) -> bool:
+        result = self._result
+        if isinstance(result, dict):
+            if result.get("won") is not None:
+                return bool(result["won"])
+            return result.get("outcome") in ("win", "blackjack")
+        return result.is_win if result is not None else False
+
+
+def load_records(data: bytes | str, limit: int | None = None) -> list[GameRecord]:
+    """Decode a history.json payload into records, oldest first (the newest `limit`, or all)."""
+    # Decoding allocates a container per JSON object and none of it is garbage,
+    # so the cyclic GC is paused while it runs.
+    paused = gc.isenabled()
+    gc.disable()
+    try:
+        entries = loads(data)
+    finally:
+        if paused:
+            gc.enable()
+    # Synced backfill is chained after local games, so file order isn't always time order
+    entries.sort(key=lambda e: e.get("timestamp") or 0)
+    if limit is not None:
+        entries = entries[-limit:] if limit > 0 else []
+    return [GameRecord.from_dict(e) for e in entries]
@@ -0,0 +1,150 @@
+"""Running stats aggregates — updated in O(1) per recorded game."""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from lib.records import GameRecord
+
+STATS_DIR = Path.home() / ".openclaw" / "clawsino"
+STATS_FILE = STATS_DIR / "stats.json"
+# One game ID per line for every game folded into the aggregates, so games
+# trimmed from history and later re-fetched by sync aren't counted twice
+COUNTED_FILE = STATS_DIR / "counted_ids.txt"
+
+STATS_VERSION = 1
+# Hourly buckets kept; older hours only live on in the daily rollup
+MAX_HOUR_BUCKETS = 7 * 24
+
+
+def _bucket() -> dict:
+    return {"games": 0, "wins": 0, "wagered": 0.0, "payout": 0.0}
+
+
+def empty_aggregates() -> dict:
+    return {
+        "version": STATS_VERSION,
+        "totals": _bucket(),
+        "by_game": {},
+        "by_dice": {},
+        "by_hour": {},
+        "by_day": {},
+    }
+
+
+def is_win(result: dict) -> bool:
+    """Coinflip/dice report `won`; blackjack only reports `outcome`."""
+    if "won" in result:
+        return bool(result["won"])
+    return result.get("outcome") in ("win", "blackjack")
+
+
+def _add(bucket: dict, won: bool, bet: float, payout: float) -> None:
+    bucket["games"] += 1
+    bucket["wins"] += 1 if won else 0
+    bucket["wagered"] += bet
+    bucket["payout"] += payout
+
+
+def apply_game(agg: dict, record: GameRecord) -> None:
+    """Fold one history record into the aggregates in place."""
+    request = record.request or {}
+    won = record.won
+    bet = record.bet
+    payout = record.payout
+    ts = time.gmtime(record.timestamp or 0)
+    hour = time.strftime("%Y-%m-%dT%H", ts)
+    by_hour = agg["by_hour"]
+    if hour not in by_hour:
+        by_hour[hour] = _bucket()
+        if len(by_hour) > MAX_HOUR_BUCKETS:
+            for old in sorted(by_hour)[:len(by_hour) - MAX_HOUR_BUCKETS]:
+                del by_hour[old]
+
+    buckets = [
+        agg["totals"],
+        agg["by_game"].setdefault(record.type or "unknown", _bucket()),
+        agg["by_day"].setdefault(time.strftime("%Y-%m-%d", ts), _bucket()),
+    ]
+    if hour in by_hour:  # a backfilled game can be older than every kept hour
+        buckets.append(by_hour[hour])
+    if record.type == "dice" and "target" in request:
+        key = f"{request.get('prediction', '?')}:{request['target']}"
+        buckets.append(agg["by_dice"].setdefault(key, _bucket()))
+
+    for bucket in buckets:
+        _add(bucket, won, bet, payout)
+
+
+def rebuild(history: list[dict] | list[GameRecord], partial: bool = False) -> dict:
+    """Recompute aggregates from history entries (raw dicts or GameRecords).
+
+    `partial` marks aggregates rebuilt from a history window that no longer
+    holds every game played.
+    """
+    agg = empty_aggregates()
+    for entry in history:
+        apply_game(agg, GameRecord.from_dict(entry) if isinstance(entry, dict) else entry)
+    if partial:
+        agg["partial"] = True
+    return agg
+
+
+def load_aggregates() -> dict | None:
+    if STATS_FILE.exists():
+        agg = json.loads(STATS_FILE.read_text())
+        if agg.get("version") == STATS_VERSION:
+            return agg
+    return None
+
+
+def save_aggregates(agg: dict) -> None:
+    STATS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STATS_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(agg, indent=2))
+    tmp.replace(STATS_FILE)
+
+
+def load_counted() -> set[str] | None:
+    """IDs of every game counted in the aggregates (None if not tracked yet)."""
+    if not COUNTED_FILE.exists():
+        return None
+    return set(COUNTED_FILE.read_text().split())
+
+
+def mark_counted(ids: list[str]) -> None:
+    if not ids:
+        return
+    STATS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(COUNTED_FILE, "a") as f:
+        f.write("".join(f"{i}\n" for i in ids))
+
+
+def reset_counted(ids: list[str]) -> None:
+    """Replace the counted set, e.g. after the aggregates were rebuilt."""
+    STATS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = COUNTED_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text("".join(f"{i}\n" for i in ids))
+    tmp.replace(COUNTED_FILE)
+
+
+def _summarize_bucket(bucket: dict) -> dict:
+    games = bucket["games"]
+    return {
+        "games_played": games,
+        "wins": bucket["wins"],
+        "losses": games - bucket["wins"],
+        "win_rate": round(bucket["wins"] / games * 100, 1) if games else 0,
+        "total_wagered": round(bucket["wagered"], 4),
+        "total_pnl": round(bucket["payout"] - bucket["wagered"], 4),
+    }
+
+
+def summarize(agg: dict) -> dict:
+    """Turn raw aggregates into the stats dict returned by `client.get_stats`."""
+    stats = _summarize_bucket(agg["totals"])
+    stats["partial"] = agg.get("partial", False)
+    for key in ("by_game", "by_dice", "by_hour", "by_day"):
+        stats[key] = {name: _summarize_bucket(b) for name, b in sorted(agg[key].items())}
+    return stats
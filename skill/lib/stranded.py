@@ -0,0 +1,75 @@
+"""Ledger of stranded payments — paid bets whose game result never arrived.
+
+When an onchain transfer succeeds but every submit attempt fails before the
+bet's deadline, the payment proof is kept here (keyed by the bet's
+idempotency key) so `clawsino reconcile` can resubmit the same proof later
+instead of paying again.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+STRANDED_DIR = Path.home() / ".openclaw" / "clawsino"
+STRANDED_FILE = STRANDED_DIR / "stranded.json"
+
+_lock = threading.Lock()
+
+
+def load() -> dict:
+    if STRANDED_FILE.exists():
+        return json.loads(STRANDED_FILE.read_text())
+    return {}
+
+
+def _save(ledger: dict) -> None:
+    STRANDED_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STRANDED_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(ledger, indent=2))
+    tmp.replace(STRANDED_FILE)
+
+
+def record(
+    game_type: str,
+    endpoint: str,
+    data: dict,
+    payment: dict,
+    error: str,
+    delivered: bool = True,
+) -> dict:
+    """Remember a paid bet that could not be submitted. Returns the ledger entry.
+
+    `delivered` is False only when no attempt ever reached the server; once
+    any attempt may have been delivered the entry stays marked as such.
+    """
+    key = payment["idempotency_key"]
+    with _lock:
+        ledger = load()
+        entry = ledger.get(key) or {
+            "idempotency_key": key,
+            "type": game_type,
+            "endpoint": endpoint,
+            "request": data,
+            "headers": payment["headers"],
+            "tx_hash": payment.get("tx_hash"),
+            "replay_safe": payment.get("replay_safe", False),
+            "stranded_at": time.time(),
+            "attempts": 0,
+            "delivered": False,
+        }
+        entry["attempts"] += 1
+        entry["delivered"] = entry["delivered"] or delivered
+        entry["last_error"] = error
+        ledger[key] = entry
+        _save(ledger)
+    return entry
+
+
+def resolve(key: str) -> None:
+    """Drop an entry once its game has been played (or abandoned by the user)."""
+    with _lock:
+        ledger = load()
+        if ledger.pop(key, None) is not None:
+            _save(ledger)
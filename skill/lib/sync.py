@@ -0,0 +1,117 @@
+"""Incremental sync of server-side wallet history into the local store."""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from lib import client
+from lib.wallet import get_address, get_server_url
+
+SYNC_DIR = Path.home() / ".openclaw" / "clawsino"
+SYNC_FILE = SYNC_DIR / "sync.json"
+
+# Server caps /api/history page size at 200
+PAGE_SIZE = 200
+DEFAULT_WORKERS = 4
+
+
+def _load_state() -> dict:
+    if SYNC_FILE.exists():
+        return json.loads(SYNC_FILE.read_text())
+    return {}
+
+
+def _save_state(state: dict) -> None:
+    SYNC_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = SYNC_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    tmp.replace(SYNC_FILE)
+
+
+def _parse_ts(iso: str) -> float:
+    return datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp()
+
+
+def _fetch_page(wallet: str, offset: int) -> dict:
+    resp = client.get_session().get(
+        f"{get_server_url()}/api/history/{wallet}",
+        params={"limit": PAGE_SIZE, "offset": offset},
+        timeout=30,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def to_entry(record: dict) -> dict:
+    """Convert a server GameRecord into a local history entry."""
+    result = {
+        "game_id": record["gameId"],
+        "game": record.get("game"),
+        "bet": record.get("bet", 0),
+        "payout": record.get("payout", 0),
+        "won": record.get("won", False),
+    }
+    if record.get("outcome"):
+        result["outcome"] = record["outcome"]
+    return {
+        "id": record["gameId"],
+        "type": record.get("game", "unknown"),
+        "timestamp": _parse_ts(record["timestamp"]),
+        "request": {"bet": record.get("bet", 0)},
+        "result": result,
+        "source": "server",
+    }
+
+
+def sync(wallet: str | None = None, workers: int = DEFAULT_WORKERS, full: bool = False) -> dict:
+    """Pull new server records for `wallet` and merge them into local history.
+
+    The server returns history newest-first, so the delta since the last sync
+    is the first `total - last_total` records. Those pages are fetched in
+    parallel; if new games shifted the pages past the watermark, paging
+    continues until the watermark (or the end) is reached.
+    """
+    wallet = (wallet or get_address() or "").lower()
+    if not wallet:
+        raise ValueError("No wallet configured. Set CLAWSINO_PRIVATE_KEY.")
+
+    state = _load_state()
+    mark = {} if full else state.get(wallet, {})
+    last_total = mark.get("total", 0)
+    last_ts = mark.get("last_ts", 0.0)
+
+    first = _fetch_page(wallet, 0)
+    total = first.get("total", 0)
+    # Server history is in-memory and capped; a shrinking total means we
+    # can't trust the offset delta, so rescan everything and dedupe by ID.
+    delta = total - last_total if total >= last_total else total
+    if last_total > total:
+        last_ts = 0.0
+
+    records = list(first.get("records", []))
+    offsets = list(range(PAGE_SIZE, delta, PAGE_SIZE))
+    if offsets:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for page in pool.map(lambda o: _fetch_page(wallet, o), offsets):
+                records.extend(page.get("records", []))
+
+    offset = (offsets[-1] if offsets else 0) + PAGE_SIZE
+    while records and offset < total and _parse_ts(records[-1]["timestamp"]) > last_ts:
+        page = _fetch_page(wallet, offset)
+        if not page.get("records"):
+            break
+        records.extend(page["records"])
+        offset += PAGE_SIZE
+
+    fresh = [to_entry(r) for r in records if _parse_ts(r["timestamp"]) >= last_ts]
+    fresh.sort(key=lambda e: e["timestamp"])
+    added, dropped = client.merge_records(fresh)
+
+    newest = max((e["timestamp"] for e in fresh), default=last_ts)
+    state[wallet] = {"total": total, "last_ts": max(newest, last_ts)}
+    _save_state(state)
+
+    return {"wallet": wallet, "server_total": total, "fetched": len(records), "added": len(added),
+            "older_than_history": dropped}
@@ -0,0 +1,99 @@
+"""Live monitor for the server's global stats and leaderboard.
+
+Polls GET /api/stats over the pooled session with If-None-Match, so an idle
+server answers with an empty 304; the leaderboard is only re-requested when
+the stats changed. The poll interval halves while numbers move and backs off
+while they don't. Rates (games/s, volume/min) come from the difference
+between snapshots over a short trailing window.
+"""
+
+import time
+from collections import deque
+
+import requests
+
+from lib import client
+from lib.wallet import get_server_url
+
+MIN_INTERVAL = 1.0
+MAX_INTERVAL = 60.0
+BACKOFF = 1.5
+RATE_WINDOW = 60.0  # seconds of samples used for rates
+
+
+def conditional_get(endpoint: str, etag: str | None = None, params: dict | None = None,
+                    timeout: float = 10) -> tuple[dict | None, str | None]:
+    """GET with If-None-Match. Returns (body, etag); body is None on 304."""
+    headers = {"If-None-Match": etag} if etag else {}
+    resp = client.get_session().get(f"{get_server_url()}{endpoint}", params=params,
+                                    headers=headers, timeout=timeout)
+    if resp.status_code == 304:
+        return None, etag
+    resp.raise_for_status()
+    return resp.json(), resp.headers.get("ETag")
+
+
+def rates(samples: deque) -> dict:
+    """games/s and volume/min between the oldest and newest (t, games, volume) sample."""
+    if len(samples) < 2:
+        return {"games_per_sec": 0.0, "volume_per_min": 0.0}
+    t0, g0, v0 = samples[0]
+    t1, g1, v1 = samples[-1]
+    dt = t1 - t0
+    if dt <= 0:
+        return {"games_per_sec": 0.0, "volume_per_min": 0.0}
+    return {
+        "games_per_sec": round((g1 - g0) / dt, 4),
+        "volume_per_min": round((v1 - v0) / dt * 60, 6),
+    }
+
+
+def next_interval(interval: float, changed: bool, floor: float = MIN_INTERVAL) -> float:
+    if changed:
+        return max(floor, interval / 2)
+    return min(MAX_INTERVAL, interval * BACKOFF)
+
+
+def watch(interval: float = 5.0, top: int = 10, on_update=None, max_polls: int | None = None) -> None:
+    """Poll until interrupted (or `max_polls`), calling `on_update(snapshot)` after each poll.
+
+    snapshot = {stats, leaderboard, rates, interval, changed, error, polls,
+    not_modified}. `stats`/`leaderboard` hold the latest known bodies.
+    """
+    floor = min(interval, MIN_INTERVAL)
+    etags: dict[str, str | None] = {"stats": None, "leaderboard": None}
+    snapshot = {"stats": None, "leaderboard": None, "polls": 0, "not_modified": 0}
+    samples: deque = deque()
+
+    while max_polls is None or snapshot["polls"] < max_polls:
+        changed = False
+        error = None
+        try:
+            body, etags["stats"] = conditional_get("/api/stats", etags["stats"])
+            if body is None:
+                snapshot["not_modified"] += 1
+            elif body != snapshot["stats"]:
+                snapshot["stats"] = body
+                changed = True
+            if changed or snapshot["leaderboard"] is None:
+                board, etags["leaderboard"] = conditional_get(
+                    "/api/leaderboard", etags["leaderboard"], params={"limit": top})
+                if board is not None:
+                    snapshot["leaderboard"] = board
+        except requests.exceptions.RequestException as e:
+            error = str(e)
+
+        now = time.monotonic()
+        if snapshot["stats"] is not None:
+            samples.append((now, snapshot["stats"].get("totalGames", 0), snapshot["stats"].get("totalVolume", 0)))
+            while len(samples) > 2 and now - samples[0][0] > RATE_WINDOW:
+                samples.popleft()
+
+        interval = next_interval(interval, changed, floor)
+        snapshot["polls"] += 1
+        snapshot.update(rates=rates(samples), interval=interval, changed=changed, error=error)
+        if on_update:
+            on_update(snapshot)
+        if max_polls is not None and snapshot["polls"] >= max_polls:
+            break
+        time.sleep(interval)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Clawsino CLI — play casino games with USDC on Base via x402."""
 
+import gc
 import json
 import os
 import sys
@@ -11,7 +12,11 @@ import requests
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from lib import client, wallet, fairness
+# --profile / CLAWSINO_PROFILE: start before importing the rest of lib so import cost is profiled
+from lib import profiling
+_PROFILE = profiling.start() if profiling.requested(sys.argv) else None
+
+from lib import client, wallet, fairness, http_cache, records
 
 # Check if we're in onchain mode (server tells us via 402 response extra field)
 ONCHAIN_MODE = os.environ.get("CLAWSINO_RPC_URL") or os.environ.get("X402_MODE") == "onchain"
@@ -21,6 +26,42 @@ ONCHAIN_MODE = os.environ.get("CLAWSINO_RPC_URL") or os.environ.get("X402_MODE")
 # ---------------------------------------------------------------------------
 
 DEMO_MODE = False
+# --enqueue: queue game commands in the local outbox instead of playing them now
+QUEUE_MODE = False
+
+# --json / --ndjson: one JSON object per line on stdout, flushed as produced
+JSON_MODE = False
+_STARTED = time.perf_counter()
+
+
+def _emit(event: str, **fields) -> None:
+    """Write one NDJSON record to stdout, with timing fields."""
+    record = {
+        "event": event,
+        **fields,
+        "ts": round(time.time(), 3),
+        "elapsed_ms": round((time.perf_counter() - _STARTED) * 1000, 3),
+    }
+    sys.stdout.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+    sys.stdout.flush()
+
+
+def _plain(line: str) -> str:
+    """Drop the emoji / "Error:" decoration from a message line for JSON output."""
+    line = line.strip()
+    while line and not line[0].isascii():
+        line = line[1:].lstrip()
+    return line.removeprefix("Error: ")
+
+
+def _fail(*lines: str):
+    """Report an error (as text, or as an NDJSON error record) and exit 1."""
+    if JSON_MODE:
+        _emit("error", message=" ".join(_plain(line) for line in lines))
+    else:
+        for line in lines:
+            print(line)
+    sys.exit(1)
 
 
 def _demo_format(game_name: str, endpoint: str, data: dict, trace: dict) -> str:
@@ -163,18 +204,16 @@ def _network_label(network: str) -> str:
 
 
 def _get_local_usdc_address() -> str | None:
-    """Get the USDC contract address from the server's /api/contracts endpoint."""
+    """Get the USDC contract address from the server's (cached) /api/contracts endpoint."""
     try:
-        resp = requests.get(f"{wallet.get_server_url()}/api/contracts", timeout=5)
-        if resp.status_code == 200:
-            return resp.json().get("usdc")
+        return http_cache.cached_get("/api/contracts", timeout=5).get("usdc")
     except Exception:
         pass
     return None
 
 
-def _demo_play(game_name: str, endpoint: str, data: dict) -> str:
-    """Execute demo two-step flow and return formatted output."""
+def _demo_play(game_name: str, endpoint: str, data: dict) -> str | None:
+    """Execute demo two-step flow and return formatted output (None in JSON mode)."""
     # If onchain, show balance before/after
     rpc_url = os.environ.get("CLAWSINO_RPC_URL")
     balance_before = None
@@ -202,6 +241,11 @@ def _demo_play(game_name: str, endpoint: str, data: dict) -> str:
         if isinstance(body, dict) and not body.get("error"):
             client._record_game(game_name.lower(), data, body)
 
+    if JSON_MODE:
+        _emit("demo_trace", game=game_name.lower(), trace=trace,
+              balance_before=balance_before, balance_after=balance_after)
+        return None
+
     output = _demo_format(game_name, endpoint, data, trace)
 
     # Append balance info for onchain mode
@@ -223,82 +267,134 @@ def _demo_play(game_name: str, endpoint: str, data: dict) -> str:
 # Commands
 # ---------------------------------------------------------------------------
 
-def cmd_games():
+def cmd_games(args: list[str]):
     """List available games."""
-    data = client.list_games()
+    data = client.list_games(refresh="--refresh" in args)
+    if JSON_MODE:
+        for g in data.get("games", []):
+            _emit("game_info", game=g)
+        return
     print("🎰 Available Games\n")
     for g in data.get("games", []):
-        bet = g.get("bet_range", [])
-        bet_str = f"${bet[0]}–${bet[1]}" if len(bet) == 2 else "varies"
+        bet = g.get("betRange") or {}
+        bet_str = f"${bet['min']:.2f}–${bet['max']:.2f}" if "min" in bet and "max" in bet else "varies"
         print(f"  {g['name']}")
         print(f"    {g.get('description', '')}")
-        print(f"    Bet: {bet_str}  |  Edge: {g.get('house_edge', 'n/a')}  |  Payout: {g.get('payout', 'varies')}")
+        print(f"    Bet: {bet_str}  |  Odds: {g.get('odds', 'n/a')}")
         print()
 
 
 def cmd_flip(args: list[str]):
     """Play coinflip."""
     if len(args) < 2:
-        print("Usage: clawsino flip <heads|tails> <amount>")
-        sys.exit(1)
+        _fail("Usage: clawsino flip <heads|tails> <amount>")
     choice = args[0]
     if choice not in ("heads", "tails"):
-        print("Choice must be 'heads' or 'tails'")
-        sys.exit(1)
+        _fail("Choice must be 'heads' or 'tails'")
     amount = float(args[1])
+    data = {"choice": choice, "bet": amount}
+    quote = client.preview_bet("coinflip", data, offline=QUEUE_MODE)
+
+    if QUEUE_MODE:
+        _enqueue("coinflip", data)
+        return
 
     if DEMO_MODE:
-        print(_demo_play("Coinflip", "/api/coinflip", {"choice": choice, "bet": amount}))
+        _print_demo(_demo_play("Coinflip", "/api/coinflip", data))
         return
 
-    print(f"🪙 Flipping coin... {choice} for ${amount:.2f} USDC")
+    if not JSON_MODE:
+        print(f"🪙 Flipping coin... {choice} for ${amount:.2f} USDC (pays {quote['multiplier']}x)")
+    started = time.perf_counter()
     result = client.play_coinflip(choice, amount)
-    _print_result(result)
+    _show_result("coinflip", data, result, quote, started)
 
 
 def cmd_dice(args: list[str]):
     """Play dice."""
     if len(args) < 3:
-        print("Usage: clawsino dice <over|under> <target> <amount>")
-        sys.exit(1)
+        _fail("Usage: clawsino dice <over|under> <target> <amount>")
     prediction = args[0]
     if prediction not in ("over", "under"):
-        print("Prediction must be 'over' or 'under'")
-        sys.exit(1)
+        _fail("Prediction must be 'over' or 'under'")
     target = int(args[1])
     amount = float(args[2])
+    data = {"prediction": prediction, "target": target, "bet": amount}
+    quote = client.preview_bet("dice", data, offline=QUEUE_MODE)
+
+    if QUEUE_MODE:
+        _enqueue("dice", data)
+        return
 
     if DEMO_MODE:
-        print(_demo_play("Dice", "/api/dice", {"prediction": prediction, "target": target, "bet": amount}))
+        _print_demo(_demo_play("Dice", "/api/dice", data))
         return
 
-    print(f"🎲 Rolling dice... {prediction} {target} for ${amount:.2f} USDC")
+    if not JSON_MODE:
+        print(f"🎲 Rolling dice... {prediction} {target} for ${amount:.2f} USDC "
+              f"(pays {quote['multiplier']}x, {quote['win_probability'] * 100:.1f}% to win)")
+    started = time.perf_counter()
     result = client.play_dice(prediction, target, amount)
-    _print_result(result)
+    _show_result("dice", data, result, quote, started)
 
 
 def cmd_blackjack(args: list[str]):
     """Play blackjack."""
     if len(args) < 1:
-        print("Usage: clawsino blackjack <amount>")
-        sys.exit(1)
+        _fail("Usage: clawsino blackjack <amount>")
     amount = float(args[0])
+    data = {"bet": amount}
+    quote = client.preview_bet("blackjack", data, offline=QUEUE_MODE)
+
+    if QUEUE_MODE:
+        _enqueue("blackjack", data)
+        return
 
     if DEMO_MODE:
-        print(_demo_play("Blackjack", "/api/blackjack", {"bet": amount}))
+        _print_demo(_demo_play("Blackjack", "/api/blackjack", data))
         return
 
-    print(f"🃏 Dealing blackjack... ${amount:.2f} USDC")
+    if not JSON_MODE:
+        print(f"🃏 Dealing blackjack... ${amount:.2f} USDC")
+    started = time.perf_counter()
     result = client.play_blackjack(amount)
-    _print_result(result)
+    _show_result("blackjack", data, result, quote, started)
+
+
+def _enqueue(game_type: str, data: dict):
+    from lib import outbox
+
+    started = time.perf_counter()
+    key = outbox.enqueue(game_type, data, validate=False)  # already validated (offline) by preview_bet
+    enqueue_us = (time.perf_counter() - started) * 1e6
+    spawned = outbox.spawn_worker()
+    if JSON_MODE:
+        _emit("queued", key=key, game=game_type, request=data, enqueue_us=round(enqueue_us, 1),
+              worker_spawned=spawned)
+        return
+    print(f"📮 Queued {game_type} bet ${data['bet']:.2f} — key {key} ({enqueue_us:.0f} µs)")
+    if spawned:
+        print("   Started a background worker (check progress with 'clawsino outbox')")
+
+
+def _print_demo(output: str | None):
+    if output is not None:
+        print(output)
+
+
+def _show_result(game_type: str, data: dict, result: dict, quote: dict, started: float):
+    if JSON_MODE:
+        _emit("game", game=game_type, request=data, result=result, quote=quote,
+              duration_ms=round((time.perf_counter() - started) * 1000, 3))
+    else:
+        _print_result(result)
 
 
 def cmd_balance():
     """Check USDC balance."""
     addr = wallet.get_address()
     if not addr:
-        print("❌ No wallet configured. Set CLAWSINO_PRIVATE_KEY.")
-        sys.exit(1)
+        _fail("❌ No wallet configured. Set CLAWSINO_PRIVATE_KEY.")
     try:
         rpc_url = wallet.get_rpc_url()
         usdc_addr = None
@@ -308,42 +404,64 @@ def cmd_balance():
         if rpc_url == "https://mainnet.base.org":
             rpc_url = None
         bal = wallet.get_usdc_balance(addr, rpc_url=rpc_url, usdc_address=usdc_addr)
-        print(f"💰 Wallet: {addr}")
-        print(f"   USDC Balance: ${bal:.4f}")
     except Exception as e:
-        print(f"❌ Error checking balance: {e}")
-        sys.exit(1)
+        _fail(f"❌ Error checking balance: {e}")
+    if JSON_MODE:
+        _emit("balance", address=addr, usdc=bal, usdc_address=usdc_addr)
+        return
+    print(f"💰 Wallet: {addr}")
+    print(f"   USDC Balance: ${bal:.4f}")
 
 
-def cmd_history():
+def cmd_history(args: list[str]):
     """Show recent game history."""
-    games = client.get_history(20)
-    if not games:
+    limit = None if "--all" in args else _option(args, "--limit", int, 20)
+    games = client.get_records(limit)
+    # One-shot process: the records live until exit, so keep later collections
+    # from rescanning them (frozen objects are never collected)
+    gc.freeze()
+    if not games and not JSON_MODE:
         print("No games played yet.")
         return
-    print(f"📜 Recent Games ({len(games)})\n")
+    if not JSON_MODE:
+        print(f"📜 Recent Games ({len(games)})\n")
     for g in games:
-        ts = time.strftime("%Y-%m-%d %H:%M", time.localtime(g.get("timestamp", 0)))
-        result = g.get("result", {})
-        won = "✅ WIN" if result.get("won") else "❌ LOSS"
-        bet = g.get("request", {}).get("bet", 0)
-        payout = result.get("payout", 0)
-        pnl = payout - bet
-        print(f"  [{ts}] {g['type']:10s} {won}  bet=${bet:.2f}  pnl={pnl:+.2f}  id={g.get('id', 'n/a')}")
+        if JSON_MODE:
+            _emit("history", id=g.id, game=g.type, timestamp=g.timestamp or 0,
+                  bet=g.bet, payout=g.payout, pnl=round(g.pnl, 6), won=g.won)
+            continue
+        ts = time.strftime("%Y-%m-%d %H:%M", time.localtime(g.timestamp or 0))
+        mark = "✅ WIN" if g.won else "❌ LOSS"
+        print(f"  [{ts}] {g.type or '?':10s} {mark}  bet=${g.bet:.2f}  pnl={g.pnl:+.2f}  id={g.id or 'n/a'}")
 
 
 def cmd_verify(args: list[str]):
-    """Verify fairness proof for a game."""
+    """Verify fairness proof for a game, or the integrity of the whole history."""
+    if "--chain" in args:
+        _verify_chain(full="--full" in args)
+        return
     if len(args) < 1:
-        print("Usage: clawsino verify <game_id>")
-        sys.exit(1)
+        _fail("Usage: clawsino verify <game_id> | --chain [--full]")
     game_id = args[0]
     game = client.get_game_by_id(game_id)
     if not game:
-        print(f"❌ Game {game_id} not found in history.")
-        sys.exit(1)
+        _fail(f"❌ Game {game_id} not found in history.")
 
+    intact, detail = client.verify_history_entry(game_id)
     proof = game.get("result", {}).get("fairness_proof")
+    if JSON_MODE:
+        has_proof = bool(proof) and isinstance(proof, dict)
+        _emit("verify", game_id=game_id, integrity_ok=intact, integrity_detail=detail,
+              proof_present=has_proof, fairness_valid=fairness.verify_game_proof(proof) if has_proof else None)
+        if not has_proof:
+            sys.exit(1)
+        return
+
+    if intact:
+        print(f"🔗 History record intact ({detail})")
+    else:
+        print(f"⚠️  History record integrity: {detail}")
+
     if not proof or not isinstance(proof, dict):
         print(f"⚠️  No fairness proof available for game {game_id}")
         sys.exit(1)
@@ -357,43 +475,427 @@ def cmd_verify(args: list[str]):
         print(f"❌ Game {game_id} fairness proof FAILED — possible tampering!")
 
 
-def cmd_stats():
+def _verify_chain(full: bool):
+    report = client.verify_history(full=full)
+    if JSON_MODE:
+        for err in report["errors"]:
+            _emit("chain_error", message=err)
+        _emit("chain_report", full=full, **{k: v for k, v in report.items() if k != "errors"})
+        if not report["ok"]:
+            sys.exit(1)
+        return
+    if report["ok"]:
+        print(f"🔗 History chain INTACT — {report['entries']} entries, {report['checkpoints']} checkpoints")
+    else:
+        print(f"❌ History chain BROKEN — {len(report['errors'])} problem(s)")
+        for err in report["errors"][:20]:
+            print(f"   {err}")
+    print(f"   Rehashed {report['rehashed']} entries"
+          + (", rebuilt all Merkle trees" if full else ", Merkle trees rebuilt since last verified checkpoint"))
+    if report["unchained"]:
+        print(f"   {report['unchained']} older entries predate the hash chain")
+    if not report["ok"]:
+        sys.exit(1)
+
+
+def cmd_stats(args: list[str]):
     """Show win/loss stats."""
-    stats = client.get_stats()
+    rebuild = "--rebuild" in args
+    try:
+        stats = client.get_stats(rebuild=rebuild, force="--force" in args)
+    except ValueError as e:
+        _fail(f"⚠️  {e}")
+    if JSON_MODE:
+        _emit("stats", rebuilt=rebuild, **stats)
+        return
     if stats["games_played"] == 0:
         print("No games played yet.")
         return
-    print("📊 Stats\n")
+    print("📊 Stats" + (" (rebuilt from history)" if rebuild else "") + "\n")
+    if stats["partial"]:
+        print("  ⚠️  Rebuilt from the retained history window only — older games are missing from these totals\n")
     print(f"  Games played: {stats['games_played']}")
     print(f"  Wins: {stats['wins']}  Losses: {stats['losses']}")
     print(f"  Win rate: {stats['win_rate']}%")
     print(f"  Total wagered: ${stats['total_wagered']:.4f}")
     print(f"  Total P&L: ${stats['total_pnl']:+.4f}")
 
+    if stats["by_game"]:
+        print("\n  By game:")
+        for name, s in stats["by_game"].items():
+            print(f"    {name:10s} {s['games_played']:5d} games  win={s['win_rate']:5.1f}%  "
+                  f"wagered=${s['total_wagered']:.2f}  pnl={s['total_pnl']:+.2f}")
+    if stats["by_dice"]:
+        print("\n  Dice by prediction/target:")
+        for key, s in stats["by_dice"].items():
+            print(f"    {key:10s} {s['games_played']:5d} games  win={s['win_rate']:5.1f}%  pnl={s['total_pnl']:+.2f}")
+    if stats["by_day"]:
+        print("\n  Last 7 days (UTC):")
+        for day, s in list(stats["by_day"].items())[-7:]:
+            print(f"    {day}  {s['games_played']:5d} games  pnl={s['total_pnl']:+.2f}")
+
+
+def cmd_analyze(args: list[str]):
+    """Vectorized history analytics (requires numpy)."""
+    from lib import analytics
+
+    window = 50
+    bucket = "day"
+    if "--window" in args:
+        window = int(args[args.index("--window") + 1])
+    if "--bucket" in args:
+        bucket = args[args.index("--bucket") + 1]
+    bucket_seconds = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+    if bucket not in bucket_seconds:
+        _fail("Bucket must be 'hour', 'day' or 'week'")
+
+    source = _option(args, "--from", str)
+    if source:
+        # Columnar export (`export <path>.clwc`) — read straight into arrays
+        cols = analytics.load_bin(os.path.expanduser(source))
+    else:
+        cols = analytics.load_columns(client.get_history(limit=None))
+    if not len(cols["bet"]) and not JSON_MODE:
+        print("No games played yet.")
+        return
+    s = analytics.summary(cols, window)
+    pct = s["payout_percentiles"]
+    if JSON_MODE:
+        _emit("analysis", **s)
+        for row in analytics.realized_edge(cols, bucket_seconds[bucket]):
+            _emit("edge", bucket=bucket, **row)
+        return
+
+    print(f"📈 Analysis ({s['games']} games)\n")
+    print(f"  Total P&L: ${s['total_pnl']:+.4f}")
+    print(f"  Rolling P&L ({window} games): last={s['rolling_pnl_last']:+.4f}  "
+          f"min={s['rolling_pnl_min']:+.4f}  max={s['rolling_pnl_max']:+.4f}")
+    print(f"  Max drawdown: ${s['max_drawdown']:.4f}")
+    print(f"  Longest streaks: {s['streaks']['win']} wins, {s['streaks']['loss']} losses")
+    print("  Payout multiple percentiles: " + "  ".join(f"p{p}={v:.2f}x" for p, v in pct.items()))
+    print(f"\n  Realized edge by {bucket}:")
+    for row in analytics.realized_edge(cols, bucket_seconds[bucket]):
+        start = time.strftime("%Y-%m-%d %H:%M", time.gmtime(row["window_start"]))
+        print(f"    [{start}] {row['game']:10s} {row['games']:5d} games  "
+              f"wagered=${row['wagered']:.2f}  edge={row['edge'] * 100:+.2f}%")
+
+
+def cmd_export(args: list[str]):
+    """Stream history to CSV, NDJSON, or a columnar binary file."""
+    from lib import export
+
+    fmt = _option(args, "--format", str)
+    if fmt:
+        i = args.index("--format")
+        args = args[:i] + args[i + 2:]
+    paths = [a for a in args if not a.startswith("--")]
+    if not paths:
+        _fail("Usage: clawsino export <path> [--format csv|ndjson|bin] [--proofs] [--incremental]")
+    path = paths[0]
+
+    started = time.perf_counter()
+    count = export.export_history(
+        client.get_history(limit=None),
+        path,
+        fmt=fmt,
+        include_proofs="--proofs" in args,
+        incremental="--incremental" in args,
+    )
+    if JSON_MODE:
+        _emit("export", path=path, format=fmt or export.infer_format(path), records=count,
+              duration_ms=round((time.perf_counter() - started) * 1000, 3))
+        return
+    print(f"📤 Exported {count} game(s) to {path}")
+
+
+def cmd_sync(args: list[str]):
+    """Pull games played from other hosts into local history."""
+    from lib import sync
+
+    workers = int(args[args.index("--workers") + 1]) if "--workers" in args else sync.DEFAULT_WORKERS
+    started = time.time()
+    result = sync.sync(workers=workers, full="--full" in args)
+    if JSON_MODE:
+        _emit("sync", **result, duration_ms=round((time.time() - started) * 1000, 3))
+        return
+    print(f"🔄 Synced {result['wallet']}")
+    print(f"   Server games: {result['server_total']}  fetched: {result['fetched']}  new: {result['added']}")
+    if result["older_than_history"]:
+        print(f"   {result['older_than_history']} older game(s) counted in stats only (history keeps the newest 500)")
+    print(f"   Took {time.time() - started:.2f}s")
+
+
+def cmd_reconcile(args: list[str]):
+    """Resubmit (or list / drop) paid bets whose results never arrived."""
+    from lib import stranded
+
+    if "--drop" in args:
+        key = args[args.index("--drop") + 1]
+        stranded.resolve(key)
+        if JSON_MODE:
+            _emit("stranded_dropped", idempotency_key=key)
+        else:
+            print(f"🗑️  Dropped stranded payment {key}")
+        return
+
+    ledger = stranded.load()
+    if "--list" in args:
+        for entry in ledger.values():
+            if JSON_MODE:
+                _emit("stranded", **entry)
+                continue
+            ts = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["stranded_at"]))
+            print(f"  [{ts}] {entry['type']:10s} bet=${entry['request'].get('bet', 0):.2f}  "
+                  f"tx={entry.get('tx_hash')}  key={entry['idempotency_key']}  ({entry['last_error']})")
+        if not ledger and not JSON_MODE:
+            print("No stranded payments.")
+        return
+
+    if not ledger:
+        if not JSON_MODE:
+            print("No stranded payments.")
+        return
+    if not JSON_MODE:
+        print(f"🧾 Resubmitting {len(ledger)} stranded payment(s)...")
+    for outcome in client.reconcile():
+        entry = outcome["entry"]
+        if JSON_MODE:
+            _emit("reconcile", idempotency_key=entry["idempotency_key"], game=entry["type"],
+                  tx_hash=entry.get("tx_hash"), ok="result" in outcome,
+                  result=outcome.get("result"), error=outcome.get("error"))
+        elif "result" in outcome:
+            print(f"  ✅ {entry['idempotency_key']}  {entry['type']} played (id={outcome['result'].get('game_id')})")
+        else:
+            print(f"  ⚠️  {entry['idempotency_key']}  still stranded: {outcome['error']}")
+
+
+def _watch_frame(snap: dict, me: str | None) -> list[str]:
+    """Lines for one `watch` screen."""
+    lines = [f"📡 Clawsino live — {wallet.get_server_url()}   "
+             f"(next poll {snap['interval']:.1f}s, {snap['polls']} polls, {snap['not_modified']} unchanged)"]
+    stats = snap["stats"]
+    if stats:
+        r = snap["rates"]
+        lines.append(f"   Games: {stats['totalGames']:,}   Volume: ${stats['totalVolume']:,.2f}   "
+                     f"Payout: ${stats['totalPayout']:,.2f}   House edge: {stats['houseEdgeRealized']:.2f}%   "
+                     f"Wallets: {stats['uniqueWallets']}")
+        lines.append(f"   Rate: {r['games_per_sec']:.2f} games/s   ${r['volume_per_min']:,.2f}/min")
+        lines.append("")
+        for name, g in sorted(stats.get("gameBreakdown", {}).items()):
+            edge = (g["volume"] - g["payout"]) / g["volume"] * 100 if g["volume"] else 0
+            lines.append(f"   {name:10s} {g['games']:7,d} games  volume=${g['volume']:,.2f}  edge={edge:+.2f}%")
+    board = (snap["leaderboard"] or {}).get("byWagered", [])
+    if board:
+        lines.append("")
+        lines.append("🏆 Top wagered")
+        for rank, row in enumerate(board, 1):
+            you = "  ← you" if me and row["wallet"].lower() == me.lower() else ""
+            lines.append(f"   {rank:2d}. {row['wallet'][:6]}…{row['wallet'][-4:]}  wagered=${row['totalBet']:,.2f}  "
+                         f"pnl={row['netPnl']:+,.2f}  games={row['games']:,}{you}")
+    lines.append(f"⚠️  {snap['error']}" if snap["error"] else "")
+    return lines
+
+
+def _redraw(lines: list[str], previous: list[str]) -> list[str]:
+    """Rewrite only the terminal lines that changed since `previous`. Returns the drawn frame."""
+    height = max(len(lines), len(previous))
+    lines = lines + [""] * (height - len(lines))
+    if not previous:
+        out = "\n".join(lines) + "\n"
+    else:
+        out = f"\x1b[{len(previous)}A"  # back to the top of the frame
+        for i, line in enumerate(lines):
+            if i >= len(previous) or line != previous[i]:
+                out += f"\r{line}\x1b[K"
+            out += "\n"
+    sys.stdout.write(out)
+    sys.stdout.flush()
+    return lines
+
+
+def cmd_watch(args: list[str]):
+    """Live monitor of global stats and the leaderboard."""
+    from lib import watch
+
+    interval = _option(args, "--interval", float, 5.0)
+    top = _option(args, "--top", int, 10)
+    polls = _option(args, "--polls", int)
+    me = wallet.get_address()
+    tty = sys.stdout.isatty() and not JSON_MODE
+    drawn: list[str] = []
+
+    def on_update(snap):
+        nonlocal drawn
+        if JSON_MODE:
+            if snap["changed"] or snap["error"] or snap["polls"] == 1:
+                _emit("watch", stats=snap["stats"], leaderboard=snap["leaderboard"], rates=snap["rates"],
+                      interval=snap["interval"], error=snap["error"])
+        elif tty:
+            drawn = _redraw(_watch_frame(snap, me), drawn)
+        elif snap["changed"] or snap["error"] or snap["polls"] == 1:
+            # Piped: one line per change
+            stats = snap["stats"] or {}
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}  games={stats.get('totalGames')}  "
+                  f"volume={stats.get('totalVolume')}  edge={stats.get('houseEdgeRealized')}%  "
+                  f"games/s={snap['rates']['games_per_sec']}  vol/min={snap['rates']['volume_per_min']}"
+                  + (f"  error={snap['error']}" if snap["error"] else ""), flush=True)
+
+    try:
+        watch.watch(interval=interval, top=top, on_update=on_update, max_polls=polls)
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_outbox(args: list[str]):
+    """Outbox status, worker, and compaction."""
+    from lib import outbox
+
+    sub = args[0] if args and not args[0].startswith("--") else "status"
+    if sub == "worker":
+        def on_result(outcome):
+            if JSON_MODE:
+                _emit("outbox_result", **outcome)
+            elif outcome["ok"]:
+                mark = "✅ WIN " if outcome["won"] else "❌ LOSS"
+                print(f"  {mark} {outcome['key']}  bet=${outcome['bet'] or 0:.2f}  payout=${outcome['payout'] or 0:.4f}  "
+                      f"id={outcome['game_id']}", flush=True)
+            elif "retry_in" in outcome:
+                print(f"  ⏳ {outcome['key']}  retrying in {outcome['retry_in']:.0f}s: {outcome['error']}", flush=True)
+            else:
+                print(f"  ⚠️  {outcome['key']}  failed: {outcome['error']}", flush=True)
+
+        if not JSON_MODE:
+            print("📮 Outbox worker — Ctrl-C to stop", flush=True)
+        summary = outbox.run_worker(
+            rate=_option(args, "--rate"),
+            concurrency=_option(args, "--concurrency", int, outbox.DEFAULT_CONCURRENCY),
+            idle_exit=_option(args, "--idle-exit"),
+            on_result=on_result,
+        )
+        if JSON_MODE:
+            _emit("outbox_worker", **summary)
+        elif not summary["started"]:
+            print("Another outbox worker is already running.")
+        else:
+            print(f"🏁 Worker stopped — played {summary['played']}, failed {summary['failed']}, "
+                  f"retried {summary['retried']}")
+        return
+    if sub == "compact":
+        removed, kept = outbox.compact(keep_finished=0 if "--all" in args else outbox.KEEP_FINISHED)
+        if JSON_MODE:
+            _emit("outbox_compacted", removed=removed, kept=kept)
+        else:
+            print(f"🧹 Outbox journal compacted — removed {removed} finished bet(s), {kept} kept")
+        return
+    if sub != "status":
+        _fail("Usage: clawsino outbox [status|worker|compact] [--rate R] [--concurrency N] [--idle-exit S] [--all]")
+
+    items = outbox.load()
+    if JSON_MODE:
+        for item in items.values():
+            _emit("outbox_item", **{k: v for k, v in item.items() if k != "headers"})
+        return
+    counts: dict = {}
+    for item in items.values():
+        counts[item["state"]] = counts.get(item["state"], 0) + 1
+    worker = "running" if outbox.worker_running() else "stopped"
+    print(f"📮 Outbox — {len(items)} bet(s), worker {worker}")
+    if counts:
+        print("   " + "  ".join(f"{state}={n}" for state, n in sorted(counts.items())))
+    for item in sorted(items.values(), key=lambda i: i["enqueued_at"])[-20:]:
+        ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(item["enqueued_at"]))
+        detail = item.get("game_id") or item.get("error") or ""
+        print(f"  [{ts}] {item['type']:10s} {item['state']:8s} bet=${item['request'].get('bet', 0):.2f}  "
+              f"key={item['key']}  {detail}")
+
+
+def _parse_game_spec(args: list[str]) -> dict:
+    """Parse 'flip heads' / 'dice over 7' / 'blackjack' into a game spec."""
+    if not args:
+        raise ValueError("Missing game")
+    name = args[0]
+    if name in ("flip", "coinflip"):
+        if len(args) < 2 or args[1] not in ("heads", "tails"):
+            raise ValueError("Usage: autoplay flip <heads|tails> ...")
+        return {"type": "coinflip", "choice": args[1]}
+    if name == "dice":
+        if len(args) < 3 or args[1] not in ("over", "under"):
+            raise ValueError("Usage: autoplay dice <over|under> <target> ...")
+        return {"type": "dice", "prediction": args[1], "target": int(args[2])}
+    if name == "blackjack":
+        return {"type": "blackjack"}
+    raise ValueError(f"Unknown game '{name}'")
+
+
+def _option(args: list[str], name: str, cast=float, default=None):
+    if name in args:
+        return cast(args[args.index(name) + 1])
+    return default
+
+
+def cmd_autoplay(args: list[str]):
+    """Run a sustained betting session with a strategy and risk limits."""
+    from lib import autoplay
 
-def _format_card(card: dict) -> str:
-    """Format a card dict as a nice string like 'K♠'."""
-    return f"{card.get('rank','?')}{card.get('suit','')}"
+    try:
+        game = _parse_game_spec(args)
+    except ValueError as e:
+        _fail(str(e),
+              "Usage: clawsino autoplay <flip heads|dice over 7|blackjack> [--strategy flat|kelly|martingale|module:func]",
+              "         [--bet X] [--bets N] [--stop-loss X] [--take-profit X] [--max-rate R] [--bankroll X]")
+
+    bet = _option(args, "--bet", default=0.1)
+    strategy = autoplay.make_strategy(_option(args, "--strategy", str, "flat"), bet,
+                                      fraction=_option(args, "--kelly-fraction", default=1.0))
+
+    def on_bet(state, result):
+        if JSON_MODE:
+            _emit("bet", n=state["bets"], game=game["type"], bet=state["last_bet"], won=state["last_won"],
+                  payout=result.get("payout", 0), pnl=round(state["pnl"], 6), rate=round(state["rate"], 3),
+                  game_id=result.get("game_id"))
+            return
+        mark = "✅" if state["last_won"] else "❌"
+        print(f"  #{state['bets']:<5d} {mark} bet=${state['last_bet']:.2f}  "
+              f"pnl={state['pnl']:+.4f}  rate={state['rate']:.2f}/s", flush=True)
+
+    if not JSON_MODE:
+        print(f"🤖 Autoplay {game['type']} — Ctrl-C to stop\n")
+    summary = autoplay.run(
+        game,
+        strategy,
+        bankroll=_option(args, "--bankroll", default=10.0),
+        max_bets=_option(args, "--bets", int),
+        stop_loss=_option(args, "--stop-loss"),
+        take_profit=_option(args, "--take-profit"),
+        max_rate=_option(args, "--max-rate"),
+        on_bet=on_bet,
+    )
+    if JSON_MODE:
+        _emit("autoplay_summary", game=game["type"], **summary)
+        return
+    print(f"\n🏁 Stopped ({summary['stop_reason']})" + (f": {summary['error']}" if summary["error"] else ""))
+    print(f"   Bets: {summary['bets']}  Wins: {summary['wins']}  Wagered: ${summary['wagered']:.4f}")
+    print(f"   P&L: ${summary['pnl']:+.4f}  Bankroll: ${summary['bankroll']:.4f}")
+    print(f"   Sustained: {summary['rate']:.2f} bets/s over {summary['elapsed']:.1f}s")
 
 
-def _format_hand(cards: list) -> str:
-    """Format a list of card dicts into a hand string."""
-    if not cards or not isinstance(cards, list):
+def _format_hand(cards: tuple) -> str:
+    """Format a hand of Cards as a string like 'K♠  7♥'."""
+    if not cards:
         return "?"
-    return "  ".join(_format_card(c) for c in cards)
+    return "  ".join(str(c) for c in cards)
 
 
 def _print_result(result: dict):
     """Pretty-print a game result."""
-    if result.get("error"):
-        print(f"\n❌ {result.get('message', result['error'])}")
+    r = records.result_from_dict(result)
+    if r.error:
+        print(f"\n❌ {r.message or r.error}")
         return
 
-    game = result.get("game", "")
-
     # Blackjack — show hands
-    if game == "blackjack" or "playerHand" in result:
-        outcome = result.get("outcome", "")
+    if isinstance(r, records.BlackjackResult):
+        outcome = r.outcome or ""
         emoji_map = {"win": "🎉", "blackjack": "🃏🔥", "push": "🤝", "lose": "😞"}
         label_map = {"win": "WIN", "blackjack": "BLACKJACK!", "push": "PUSH", "lose": "LOSS"}
         emoji = emoji_map.get(outcome, "🎰")
@@ -401,13 +903,11 @@ def _print_result(result: dict):
 
         print(f"\n{emoji} {label}")
         print()
-        player_hand = result.get("playerHand", [])
-        dealer_hand = result.get("dealerHand", [])
-        print(f"   Your hand:   {_format_hand(player_hand)}  ({result.get('playerTotal', '?')})")
-        print(f"   Dealer hand: {_format_hand(dealer_hand)}  ({result.get('dealerTotal', '?')})")
+        print(f"   Your hand:   {_format_hand(r.player_hand)}  ({r.player_total or '?'})")
+        print(f"   Dealer hand: {_format_hand(r.dealer_hand)}  ({r.dealer_total or '?'})")
         print()
-        payout = result.get("payout", 0)
-        bet = result.get("bet", 0)
+        payout = r.payout or 0
+        bet = r.bet or 0
         if outcome in ("win", "blackjack"):
             print(f"   💰 Payout: ${payout:.2f} USDC (+${payout - bet:.2f})")
         elif outcome == "push":
@@ -416,80 +916,118 @@ def _print_result(result: dict):
             print(f"   💸 Lost ${bet:.2f} USDC")
     else:
         # Coinflip / Dice
-        won = result.get("won", False)
+        won = r.is_win
         emoji = "🎉" if won else "😞"
         print(f"\n{emoji} {'WIN' if won else 'LOSS'}")
-        payout = result.get("payout", 0)
-        bet = result.get("bet", 0)
+        payout = r.payout or 0
+        bet = r.bet or 0
         if won:
             print(f"   💰 Payout: ${payout:.4f} USDC (+${payout - bet:.4f})")
         else:
             print(f"   💸 Lost ${bet:.4f} USDC")
         # Show game-specific details
-        if "result" in result:
-            print(f"   Result: {result['result']}")
-        if "roll" in result:
-            print(f"   Roll: {result['roll']}")
+        if isinstance(r, records.CoinflipResult) and r.result is not None:
+            print(f"   Result: {r.result}")
+        if isinstance(r, records.DiceResult) and r.roll is not None:
+            print(f"   Roll: {r.roll}")
 
-    if result.get("fairness_proof"):
+    if r.get("fairness_proof"):
         print(f"   🔐 Fairness proof included (verify with 'clawsino verify <game_id>')")
-    if result.get("game_id"):
-        print(f"   Game ID: {result['game_id']}")
+    if r.game_id:
+        print(f"   Game ID: {r.game_id}")
 
 
 COMMANDS = {
-    "games": lambda args: cmd_games(),
+    "games": cmd_games,
     "flip": cmd_flip,
     "dice": cmd_dice,
     "blackjack": cmd_blackjack,
     "balance": lambda args: cmd_balance(),
-    "history": lambda args: cmd_history(),
+    "history": cmd_history,
     "verify": cmd_verify,
-    "stats": lambda args: cmd_stats(),
+    "stats": cmd_stats,
+    "analyze": cmd_analyze,
+    "export": cmd_export,
+    "sync": cmd_sync,
+    "reconcile": cmd_reconcile,
+    "watch": cmd_watch,
+    "outbox": cmd_outbox,
+    "autoplay": cmd_autoplay,
 }
 
 
+def _run(cmd: str, args: list[str]):
+    try:
+        COMMANDS[cmd](args)
+    finally:
+        if _PROFILE:
+            profiling.finish(_PROFILE, cmd)
+
+
 def main():
-    global DEMO_MODE
+    global DEMO_MODE, JSON_MODE, QUEUE_MODE
 
-    # Parse --demo flag from anywhere in argv
+    # Parse --demo / --json flags from anywhere in argv
     args = list(sys.argv[1:])
     if "--demo" in args:
         DEMO_MODE = True
         args.remove("--demo")
+    for flag in ("--json", "--ndjson"):
+        if flag in args:
+            JSON_MODE = True
+            args.remove(flag)
+    if "--profile" in args:
+        args.remove("--profile")
+    if "--enqueue" in args:
+        QUEUE_MODE = True
+        args.remove("--enqueue")
 
     if len(args) < 1 or args[0] in ("-h", "--help", "help"):
-        print("Usage: clawsino [--demo] <command> [args...]")
+        print("Usage: clawsino [--demo] [--json] [--profile] [--enqueue] <command> [args...]")
         print()
         print("Commands:")
-        print("  games                          List available games")
+        print("  games [--refresh]              List available games")
         print("  flip <heads|tails> <amount>     Play coinflip")
         print("  dice <over|under> <target> <amount>  Play dice")
         print("  blackjack <amount>             Play blackjack")
         print("  balance                        Check USDC balance")
-        print("  history                        Recent game results")
+        print("  history [--limit N|--all]      Recent game results")
         print("  verify <game_id>               Verify fairness proof")
-        print("  stats                          Win/loss statistics")
+        print("  verify --chain [--full]        Check history hash chain for tampering")
+        print("  stats [--rebuild]              Win/loss statistics")
+        print("  analyze [--window N] [--bucket hour|day|week]  Drawdown, streaks, edge (numpy)")
+        print("  export <path> [--format csv|ndjson|bin] [--proofs] [--incremental]")
+        print("                                 Export history for offline analysis")
+        print("  sync [--workers N] [--full]    Pull this wallet's server-side history")
+        print("  reconcile [--list|--drop KEY]  Resubmit paid bets whose results never arrived")
+        print("  watch [--interval S] [--top N] [--polls N]  Live global stats and leaderboard")
+        print("  outbox [status|worker|compact] [--rate R] [--concurrency N] [--idle-exit S]")
+        print("                                 Queued bets and the background worker that plays them")
+        print("  autoplay <flip heads|dice over 7|blackjack> [--strategy S] [--bet X] [--bets N]")
+        print("           [--stop-loss X] [--take-profit X] [--max-rate R]  Run a betting session")
         print()
         print("Flags:")
         print("  --demo    Show full x402 payment flow (for demos/presentations)")
+        print("  --json    Stream NDJSON (one object per game/row/result) instead of text; alias --ndjson")
+        print("  --enqueue Queue flip/dice/blackjack in the local outbox and return at once")
+        print("  --profile Write CPU + allocation reports to ~/.openclaw/clawsino/profiles (or set CLAWSINO_PROFILE=1)")
         sys.exit(0)
 
     cmd = args[0]
     if cmd not in COMMANDS:
-        print(f"Unknown command: {cmd}")
-        print("Run 'clawsino help' for usage.")
-        sys.exit(1)
+        _fail(f"Unknown command: {cmd}", "Run 'clawsino help' for usage.")
 
     try:
-        COMMANDS[cmd](args[1:])
+        _run(cmd, args[1:])
+    except BrokenPipeError:
+        # Reader went away (e.g. `clawsino --json history --all | head`)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(0)
     except requests.exceptions.ConnectionError:
-        print(f"❌ Cannot connect to game server at {wallet.get_server_url()}")
-        print("   Is the server running? Check CLAWSINO_SERVER_URL.")
-        sys.exit(1)
+        _fail(f"❌ Cannot connect to game server at {wallet.get_server_url()}",
+              "   Is the server running? Check CLAWSINO_SERVER_URL.")
     except Exception as e:
-        print(f"❌ Error: {e}")
-        sys.exit(1)
+        _fail(f"❌ Error: {e}")
 
 
 if __name__ == "__main__":